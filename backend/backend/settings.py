@@ -61,11 +61,12 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'wave2.authentication.ClaimsAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES':
         ['rest_framework.permissions.AllowAny'],
+    'DEFAULT_PAGINATION_CLASS': 'wave2.pagination.CursorPagination',
     'TEST_REQUEST_DEFAULT_FORMAT': 'json',
 }
 
@@ -90,7 +91,12 @@ EMAIL_PAGE_TEMPLATE = 'confirm_template.html'
 EMAIL_PAGE_DOMAIN = 'https://api.hacktues.com/'
 
 SENDGRID_API_KEY = environ.get('apikey')
-EMAIL_BACKEND = "sendgrid_backend.SendgridBackend"
+# mail is queued in the database and sent by `manage.py send_emails`
+EMAIL_BACKEND = 'wave2.mail.OutboxBackend'
+OUTBOX_EMAIL_BACKEND = environ.get('OUTBOX_EMAIL_BACKEND',
+                                   'sendgrid_backend.SendgridBackend')
+OUTBOX_RATE_PER_MINUTE = 300
+OUTBOX_MAX_ATTEMPTS = 5
 # EMAIL_SERVER = EMAIL_HOST = 'smtp.gmail.com'
 # EMAIL_PORT = 587
 # EMAIL_ADDRESS = EMAIL_HOST_USER = 'yoan.p.dzhelekarski.2017@elsys-bg.org'
@@ -104,6 +110,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'wave2.audit.AuditMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -150,6 +157,20 @@ DATABASES = {
 }
 
 
+# Cache shared between the workers, created with `createcachetable`
+# https://docs.djangoproject.com/en/3.1/topics/cache/#database-caching
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache',
+    }
+}
+
+# Cached responses of the read endpoints, see wave2/versions.py
+CACHE_MIDDLEWARE_ALIAS = 'default'
+CACHE_MIDDLEWARE_SECONDS = 600
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
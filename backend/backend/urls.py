@@ -20,12 +20,16 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView, TokenRefreshView
 )
 
+from wave2.authentication import ClaimsTokenObtainPairSerializer
+
 urlpatterns = [
     path('', include('wave2.urls')),
     path('', include('wave3.urls')),
     path('admin/', admin.site.urls),
     path('auth/', include('rest_framework.urls')),
-    path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('token/', TokenObtainPairView.as_view(
+        serializer_class=ClaimsTokenObtainPairSerializer
+    ), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('email/', include(mail_urls)),
 ]
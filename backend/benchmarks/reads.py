@@ -0,0 +1,80 @@
+"""
+Concurrent read benchmark - the sync DRF views through the WSGI handler
+against the async views through the ASGI handler, in one process.
+
+    python benchmarks/reads.py [--settings backend.settings] [--path teams/]
+                               [--clients 20] [--requests 50]
+
+The sync clients run on a thread each, the async ones on one event loop.
+Both read the configured database, so fill it first. The sync views
+answer repeated reads from the response cache, the async ones do not.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+def run_sync(path, clients, requests):
+    from django.db import connection
+    from django.test import Client
+
+    def client_run(_):
+        client = Client()
+        for _ in range(requests):
+            assert client.get(path).status_code == 200
+        connection.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        list(pool.map(client_run, range(clients)))
+    return time.perf_counter() - start
+
+
+def run_async(path, clients, requests):
+    from django.test import AsyncClient
+
+    async def client_run():
+        client = AsyncClient()
+        for _ in range(requests):
+            assert (await client.get(path)).status_code == 200
+
+    async def main():
+        await asyncio.gather(*(client_run() for _ in range(clients)))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--settings', default='backend.settings')
+    parser.add_argument('--path', default='teams/')
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = args.settings
+    sys.path.insert(0, str(BACKEND))
+    import django
+    from django.test.utils import setup_test_environment
+    django.setup()
+    setup_test_environment()  # lets the test clients in
+
+    total = args.clients * args.requests
+    for name, run, path in (('sync ', run_sync, f'/{args.path}'),
+                            ('async', run_async, f'/async/{args.path}')):
+        run(path, 1, 1)  # warm up
+        elapsed = run(path, args.clients, args.requests)
+        print(f'{name} {path}: {total / elapsed:.0f} requests/s, '
+              f'{args.clients} clients x {args.requests} requests')
+
+
+if __name__ == '__main__':
+    main()
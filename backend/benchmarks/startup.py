@@ -0,0 +1,46 @@
+"""
+Cold start benchmark - times `django.setup()` in fresh processes.
+
+    python benchmarks/startup.py [--settings backend.settings] [--runs 20]
+
+Run it from different directories to check that importing the models
+does not depend on the working directory.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--settings', default='backend.settings')
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=args.settings)
+    env['PYTHONPATH'] = os.pathsep.join(
+        filter(None, [str(BACKEND), env.get('PYTHONPATH')])
+    )
+
+    times = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-c', 'import django; django.setup()'],
+            env=env, check=True,
+        )
+        times.append(time.perf_counter() - start)
+
+    print(f'django.setup() in {os.getcwd()}: '
+          f'median {statistics.median(times) * 1000:.1f} ms, '
+          f'min {min(times) * 1000:.1f} ms over {args.runs} runs')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,27 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.db.models import Exists, OuterRef, Value
+from django.db.models.functions import Concat
 
-from . import models
+from . import bulk, models
 
 @admin.register(models.FieldValidationDate)
 class DateAdmin(admin.ModelAdmin):
     list_display = 'field', 'date'
 
 
+@admin.register(models.Email)
+class EmailAdmin(admin.ModelAdmin):
+    list_display = 'subject', 'to', 'created', 'sent', 'attempts'
+    list_filter = 'sent', 'attempts'
+    readonly_fields = 'created',
+
+
 @admin.register(models.Log)
 class LogAdmin(admin.ModelAdmin):
     list_display = 'user', 'action', 'date'
     list_filter = 'user', 'date'
+    list_select_related = 'user',
 
 
 @admin.register(models.SmallInteger)
@@ -19,9 +29,21 @@ class SmallIntegerAdmin(admin.ModelAdmin):
     list_display = 'name', 'value'
 
 
+def bulk_action(operation):
+    def action(modeladmin, request, queryset):
+        count = bulk.apply(operation, queryset.values_list('id', flat=True),
+                           request.user)
+        modeladmin.message_user(request, f'{operation}: {count} teams')
+
+    action.__name__ = operation
+    action.short_description = f'{operation.capitalize()} selected teams'
+    return action
+
+
 @admin.register(models.Team)
 class TeamAdmin(admin.ModelAdmin):
-    list_display = 'name', 'captain', 'is_full', 'confirmed'
+    list_display = ('name', 'captain_name', 'member_count', 'is_confirmed',
+                    'is_full', 'confirmed')
     fieldsets = (
         (None, {'fields': ('id', 'name', 'github_link', 'users',
                            'is_full', 'confirmed')}),
@@ -34,11 +56,26 @@ class TeamAdmin(admin.ModelAdmin):
     list_filter = 'is_full', 'confirmed'
     ordering = 'date_joined',
     filter_horizontal = 'users', 'technologies'
+    actions = [bulk_action(operation) for operation in bulk.OPERATIONS]
 
-    def captain(self, obj):
-        return models.User.objects.get(id=obj.captain)
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            captain_name=Concat('captain__first_name', Value(' '),
+                                'captain__last_name'),
+        )
 
-    captain.short_description = 'captain'
+    def captain_name(self, obj):
+        return obj.captain_name
+
+    captain_name.short_description = 'captain'
+    captain_name.admin_order_field = 'captain_name'
+
+    def is_confirmed(self, obj):
+        return obj.is_confirmed
+
+    is_confirmed.boolean = True
+    is_confirmed.short_description = 'is_confirmed'
+    is_confirmed.admin_order_field = 'member_count'
 
 
 admin.site.register(models.Technology)
@@ -66,16 +103,27 @@ class UserAdmin(UserAdmin):
     ordering = 'id',
     readonly_fields = 'id',
 
+    def get_queryset(self, request):
+        memberships = models.Team.users.through.objects.filter(
+            user=OuterRef('pk')
+        )
+        return super().get_queryset(request).annotate(
+            full_name=Concat('first_name', Value(' '), 'last_name'),
+            in_team=Exists(memberships),
+        )
+
     def name(self, obj):
-        return obj.get_full_name()
+        return obj.full_name
 
     name.short_description = 'name'
+    name.admin_order_field = 'full_name'
 
     def has_team(self, obj):
-        return bool(obj.team_set.count())
+        return obj.in_team
 
     has_team.is_boolean = True
     has_team.short_description = 'has_team'
+    has_team.admin_order_field = 'in_team'
 
 
 class RegisteredUser(models.User):
@@ -86,9 +134,4 @@ class RegisteredUser(models.User):
 @admin.register(RegisteredUser)
 class RegisteredUserAdmin(UserAdmin):
     def get_queryset(self, request):
-        queryset = super().get_queryset(request)
-        ids = set()
-        for user in queryset:
-            if user.has_team:
-                ids.add(user.id)
-        return queryset.filter(id__in=ids)
+        return super().get_queryset(request).filter(in_team=True)
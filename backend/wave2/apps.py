@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class Wave2Config(AppConfig):
     name = 'wave2'
+
+    def ready(self):
+        from . import signals  # noqa: F401
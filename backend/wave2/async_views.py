@@ -0,0 +1,110 @@
+"""
+Async read endpoints for the polling clients, served by backend.asgi.
+
+Django 3.1 has no async ORM interface, so every view runs its queries
+and the serialization in one sync_to_async call on the thread pool and
+awaits it; under ASGI a waiting poll holds no worker. The responses
+match the GETs of the DRF viewsets, including the authentication,
+?fields=, ?expand=, the cursor pagination and the error responses, but
+skip their ETags and response cache.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import PermissionDenied
+from django.db import close_old_connections
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse
+from rest_framework.exceptions import APIException
+
+from .pagination import CursorPagination
+from .views import TeamViewSet, UserViewSet
+
+
+def database(func):
+    """
+    Runs func on the thread pool with a fresh database connection
+    that is closed again afterwards.
+    """
+    @wraps(func)
+    def inner(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(inner, thread_sensitive=False)
+
+
+def read_view(viewset, request, **kwargs):
+    """
+    An instance of the viewset set up for a GET, with the request
+    wrapped by its authenticators.
+    """
+    action = 'retrieve' if kwargs else 'list'
+    view = viewset(action_map={'get': action, 'head': action},
+                   format_kwarg=None, args=(), kwargs=kwargs)
+    view.request = view.initialize_request(request, **kwargs)
+    view.headers = view.default_response_headers
+    return view
+
+
+def read_only(view):
+    @wraps(view)
+    async def inner(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        return await view(request, *args, **kwargs)
+    return inner
+
+
+def page(view, queryset):
+    paginator = CursorPagination()
+    objects = paginator.paginate_queryset(queryset, view.request, view)
+    return {
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link(),
+        'results': view.get_serializer(objects, many=True).data,
+    }
+
+
+def list_data(view):
+    return page(view, view.filter_queryset(view.get_queryset()))
+
+
+def detail_data(view):
+    return view.get_serializer(view.get_object()).data
+
+
+@database
+def respond(viewset, request, data, **kwargs):
+    """
+    Checks the request like the viewset does (authentication,
+    permissions, throttles) and answers with data(view), or with the
+    error response of the viewset for a failed check or lookup.
+    """
+    view = read_view(viewset, request, **kwargs)
+    try:
+        view.initial(view.request, **kwargs)
+        return JsonResponse(data(view), safe=False)
+    except (APIException, Http404, PermissionDenied) as exc:
+        error = view.handle_exception(exc)
+    response = JsonResponse(error.data, status=error.status_code, safe=False)
+    for header, value in error.items():
+        if header != 'Content-Type':
+            response[header] = value
+    return response
+
+
+@read_only
+async def team_list(request):
+    return await respond(TeamViewSet, request, list_data)
+
+
+@read_only
+async def team_detail(request, pk):
+    return await respond(TeamViewSet, request, detail_data, pk=pk)
+
+
+@read_only
+async def user_detail(request, pk):
+    return await respond(UserViewSet, request, detail_data, pk=pk)
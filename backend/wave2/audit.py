@@ -0,0 +1,67 @@
+"""
+The log of the team actions, written in batches.
+
+record() keeps the entries of a request in memory and AuditMiddleware
+inserts them with one query after the view, outside of its transaction,
+so the log table is not locked while the team rows are. A request that
+fails writes none of its entries, like the rolled back actions they
+describe. Outside of a request (commands, the shell) an entry is
+inserted when the current transaction commits.
+
+The middleware runs in both modes, so it does not make Django run the
+async views of the chain on a thread.
+"""
+import asyncio
+
+from asgiref.local import Local
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.utils.decorators import sync_and_async_middleware
+
+from .models import Log
+
+_state = Local()
+
+
+def record(user, action):
+    """
+    Logs the action of the user, who may be anonymous.
+    """
+    entry = Log(user=user if user and user.is_authenticated else None,
+                action=action)
+    buffer = getattr(_state, 'buffer', None)
+    if buffer is not None:
+        buffer.append(entry)
+    else:
+        transaction.on_commit(entry.save)
+
+
+@sync_and_async_middleware
+class AuditMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # makes Django await the instance
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        _state.buffer = []
+        try:
+            response = self.get_response(request)
+        finally:
+            entries, _state.buffer = _state.buffer, None
+        if entries and response.status_code < 400:
+            Log.objects.bulk_create(entries)
+        return response
+
+    async def __acall__(self, request):
+        _state.buffer = []
+        try:
+            response = await self.get_response(request)
+        finally:
+            entries, _state.buffer = _state.buffer, None
+        if entries and response.status_code < 400:
+            await sync_to_async(Log.objects.bulk_create)(entries)
+        return response
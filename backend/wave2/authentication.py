@@ -0,0 +1,99 @@
+"""
+JWT authentication without the User query.
+
+The tokens carry the user's claims from the time they were issued, for
+the clients. As the team and captaincy change during the day a token is
+valid, the server reads the claims from a copy in the memory of the
+worker instead. The copy is kept while the version stamp of the User
+table stays the same (see versions.py), which is read together with the
+other stamps of the request. A change of the claims drops them from the
+copy and bumps the stamp on commit (see signals.py), so every worker
+loads them again. request.user is a User with only the claim fields
+loaded, which is enough for the permission checks; the first access to
+another field loads the rest of the row.
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from . import versions
+from .models import User
+
+CLAIMS = ('is_active', 'is_staff', 'is_superuser', 'is_captain',
+          'current_team_id')
+
+versions.track(User)
+# (the User stamp, {user id: claims}) of this worker
+_copy = (None, {})
+
+
+def claims(user_id):
+    """
+    Returns the claims of the user, None if there is no such user.
+    """
+    global _copy
+    # read before the row, so an older row is not kept under a newer stamp
+    stamp, = versions.stamps(User)
+    copy_stamp, copy = _copy
+    if copy_stamp != stamp:
+        copy = {}
+        _copy = stamp, copy
+
+    found = copy.get(user_id)
+    if found is None:
+        found = User.objects.filter(pk=user_id).values(*CLAIMS).first()
+        if found is None:
+            return None
+        copy[user_id] = found
+    return found
+
+
+def invalidate(*user_ids):
+    """
+    Drops the claims from the copy of this worker now and from the
+    others once the change is committed.
+    """
+    if not user_ids:
+        return
+    copy = _copy[1]
+    for user_id in user_ids:
+        copy.pop(user_id, None)
+    versions.bump(User)
+
+
+def lazy_user(user_id, claims):
+    """
+    A User with only the claim fields loaded, the others are
+    deferred and loaded together on first access.
+    """
+    values = {'id': user_id, **claims}
+    fields = [field.attname for field in User._meta.concrete_fields
+              if field.attname in values]
+    return User.from_db(User.objects.db, fields,
+                        [values[field] for field in fields])
+
+
+class ClaimsAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        found = user_id is not None and claims(user_id)
+        if not found:
+            raise AuthenticationFailed(_('User not found'),
+                                       code='user_not_found')
+        if not found['is_active']:
+            raise AuthenticationFailed(_('User is inactive'),
+                                       code='user_inactive')
+        return lazy_user(user_id, found)
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for claim in CLAIMS:
+            token[claim] = getattr(user, claim)
+        if token['current_team_id'] is not None:
+            token['current_team_id'] = str(token['current_team_id'])
+        return token
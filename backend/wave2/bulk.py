@@ -0,0 +1,49 @@
+"""
+Operations on many teams at once, for the organizers.
+
+An operation is one UPDATE of the selected teams. The log entries are
+inserted together and the waitlist is promoted once at the end, all in
+one transaction. Confirming follows the waitlist: only the waiting
+teams, which have enough members, are confirmed, in their order and
+while there are free places.
+"""
+from django.db import transaction
+
+from . import versions, waitlist
+from .models import Log, Team
+from .signals import teams_bulk_changed
+
+OPERATIONS = {
+    'confirm': {'confirmed': True, 'ready': None},
+    'unconfirm': {'confirmed': False, 'ready': None, 'is_full': False},
+    'lock': {'is_full': True},
+    'unlock': {'is_full': False},
+}
+
+
+@transaction.atomic
+def apply(operation, team_ids, user=None):
+    """
+    Applies the operation to the teams, returns the number of teams changed.
+    """
+    changes = OPERATIONS[operation]
+    # the team rows before max_teams, like TeamSerializer.update
+    ids = list(Team.objects.select_for_update().filter(id__in=team_ids)
+               .order_by('id').values_list('id', flat=True))
+    if operation == 'confirm':
+        ids = waitlist.promote(ids)
+    else:
+        if 'confirmed' in changes:
+            waitlist.lock()  # one after another with the promotions
+        Team.objects.filter(id__in=ids).update(**changes)
+        versions.bump(Team)
+        if 'confirmed' in changes:
+            teams_bulk_changed.send(sender=Team)
+    Log.objects.bulk_create([
+        Log(user=user, action={'operation': operation, 'team': str(team_id)})
+        for team_id in ids
+    ])
+
+    if changes.get('confirmed') is False:
+        waitlist.promote()  # the freed places
+    return len(ids)
@@ -0,0 +1,24 @@
+"""
+Choices of the User fields.
+"""
+
+# Cyrillic A, B, V, G - escaped, the source is also edited in windows-1251
+CLASSES = '\u0410', '\u0411', '\u0412', '\u0413'
+
+FORMS = [
+    (f'{grade}{letter}', f'{grade} {letter}')
+    for grade in range(8, 13) for letter in CLASSES
+]
+
+FOOD_PREFERENCES = [
+    ('0', 'None'),
+    ('Vgtn', 'Vegeterian'),
+    ('Vgn', 'Vegan'),
+]
+
+SIZES = [
+    ('s', 'S'),
+    ('m', 'M'),
+    ('l', 'L'),
+    ('xl', 'XL'),
+]
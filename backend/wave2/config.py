@@ -0,0 +1,105 @@
+"""
+Process-local copy of the SmallInteger and FieldValidationDate rows.
+
+Both tables are loaded together on first use and served from memory.
+Every worker compares its copy against a version key in the shared cache
+once per request, and the key is bumped whenever one of the rows changes
+(see signals.py), so admin edits are picked up by the next request.
+"""
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'wave2:config:version'
+
+
+class Config:
+    def __init__(self):
+        self._integers = None
+        self._dates = None
+        self._version = None
+        self._checked = False
+
+    def _load(self):
+        if not self._checked:
+            version = cache.get(VERSION_KEY)
+            if version != self._version:
+                self._integers = None
+            self._version = version
+            self._checked = True
+
+        if self._integers is None:
+            from .models import FieldValidationDate, SmallInteger
+
+            self._dates = {
+                row.field: row.date
+                for row in FieldValidationDate.objects.all()
+            }
+            self._integers = {
+                row.name: row.value for row in SmallInteger.objects.all()
+            }
+
+    def expire(self):
+        """
+        Makes the next read compare the local copy with the shared version.
+        """
+        self._checked = False
+
+    def invalidate(self):
+        """
+        Drops the local copy and makes all other workers drop theirs once
+        the change is committed. The version is not written inside the
+        transaction, which would hold the lock on its cache row until
+        the commit.
+        """
+        self._integers = None
+        transaction.on_commit(self._bump)
+
+    def _bump(self):
+        self._integers = None
+        self._version = uuid.uuid4().hex
+        cache.set(VERSION_KEY, self._version, None)
+
+    def integer(self, name):
+        self._load()
+        try:
+            return self._integers[name]
+        except KeyError:
+            from .models import SmallInteger
+            raise SmallInteger.DoesNotExist(name) from None
+
+    def date(self, field):
+        self._load()
+        try:
+            return self._dates[field]
+        except KeyError:
+            from .models import FieldValidationDate
+            raise FieldValidationDate.DoesNotExist(field) from None
+
+    @property
+    def dates(self):
+        """
+        All validation dates as a {field: date} dict.
+        """
+        self._load()
+        return dict(self._dates)
+
+    @property
+    def max_teams(self):
+        return self.integer('max_teams')
+
+    @property
+    def min_users_in_team(self):
+        return self.integer('min_users_in_team')
+
+    @property
+    def max_users_in_team(self):
+        return self.integer('max_users_in_team')
+
+    @property
+    def team_editable(self):
+        return self.date('team_editable')
+
+
+config = Config()
@@ -0,0 +1,97 @@
+"""
+Streaming CSV and NDJSON exports for the organizers.
+
+A viewset with ExportMixin gets a staff only `export` list action
+(?output=csv or ?output=ndjson). The rows are written while they are
+read from the database, a chunk at a time, so memory use does not grow
+with the number of rows.
+"""
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
+from rest_framework.serializers import ValidationError
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """
+    File-like object for csv.writer that returns the line instead of
+    writing it.
+    """
+    def write(self, value):
+        return value
+
+
+def chunked(queryset, chunk_size=500):
+    """
+    Yields the objects of the queryset in pk order with one query (plus
+    one per prefetch) for each chunk. QuerySet.iterator() ignores
+    prefetch_related in this Django version.
+    """
+    queryset = queryset.order_by('pk')
+    chunk = list(queryset[:chunk_size])
+    while chunk:
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        chunk = list(queryset.filter(pk__gt=chunk[-1].pk)[:chunk_size])
+
+
+def names(related):
+    """
+    Column with the comma separated related objects.
+    """
+    return lambda obj: ', '.join(map(str, getattr(obj, related).all()))
+
+
+def as_csv(objects, columns):
+    writer = csv.writer(Echo())
+    # the BOM makes Excel read the file as utf-8
+    yield '\ufeff' + writer.writerow(columns)
+    for obj in objects:
+        yield writer.writerow([get(obj) for get in columns.values()])
+
+
+def as_ndjson(objects, columns):
+    for obj in objects:
+        yield json.dumps(
+            {name: get(obj) for name, get in columns.items()},
+            ensure_ascii=False, default=str,
+        ) + '\n'
+
+
+class ExportMixin:
+    """
+    export_columns maps the column names to functions of an object,
+    export_queryset is what gets exported.
+    """
+    export_columns = {}
+    export_queryset = None
+    export_chunk_size = 500
+
+    @action(detail=False, permission_classes=[IsAdminUser])
+    def export(self, request):
+        output = request.query_params.get('output', 'csv')
+        if output not in CONTENT_TYPES:
+            raise ValidationError(
+                {'output': f'expected one of {", ".join(CONTENT_TYPES)}'}
+            )
+
+        write = as_csv if output == 'csv' else as_ndjson
+        objects = chunked(self.export_queryset.all(), self.export_chunk_size)
+        response = StreamingHttpResponse(
+            write(objects, self.export_columns),
+            content_type=CONTENT_TYPES[output],
+        )
+        name = self.export_queryset.model._meta.verbose_name_plural
+        response['Content-Disposition'] = (
+            f'attachment; filename="{name}.{output}"'
+        )
+        return response
@@ -0,0 +1,38 @@
+"""
+Filtering and search for the list endpoints.
+
+?q= matches every word as the start of one of the view's search_fields,
+which MySQL answers from the indexes on those columns (a LIKE 'word%'
+with the case insensitive collation). A contains search could not use
+them. The filter_fields are lookups on indexed columns.
+"""
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.serializers import ValidationError
+
+
+class LookupFilter(BaseFilterBackend):
+    """
+    `filter_fields` maps the query parameters to lookups,
+    `search_fields` lists the columns searched by ?q=.
+    """
+    def filter_queryset(self, request, queryset, view):
+        for param, lookup in getattr(view, 'filter_fields', {}).items():
+            if (value := request.query_params.get(param)) is not None:
+                try:
+                    queryset = queryset.filter(**{lookup: value})
+                except (ValueError, DjangoValidationError):
+                    raise ValidationError({param: f'invalid value {value}'})
+
+        words = request.query_params.get('q', '').split()
+        if words and (fields := getattr(view, 'search_fields', ())):
+            queryset = queryset.filter(reduce(and_, (
+                reduce(or_, (Q(**{f'{field}__istartswith': word})
+                             for field in fields))
+                for word in words
+            )))
+        return queryset
@@ -0,0 +1,125 @@
+"""
+Database backed outbox for outgoing mail.
+
+OutboxBackend is set as EMAIL_BACKEND, so sending a message from a view
+only inserts an Email row. The send_emails command delivers the rows
+through OUTBOX_EMAIL_BACKEND. Attachments are not supported.
+"""
+import logging
+import time
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Email
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        Email.objects.bulk_create(
+            [Email.from_message(message) for message in email_messages]
+        )
+        return len(email_messages)
+
+
+def pending():
+    return Email.objects.filter(
+        sent=None, attempts__lt=settings.OUTBOX_MAX_ATTEMPTS
+    )
+
+
+class Outbox:
+    """
+    Sends the pending mail in batches through one reused connection,
+    at most OUTBOX_RATE_PER_MINUTE messages per minute. A failed message
+    is retried after 2, 4, 8... minutes until OUTBOX_MAX_ATTEMPTS.
+    """
+    def __init__(self, batch_size=50):
+        self.batch_size = batch_size
+        self.rate = settings.OUTBOX_RATE_PER_MINUTE
+        self.window = deque()  # send times during the last minute
+
+    def allowance(self):
+        now = time.monotonic()
+        while self.window and self.window[0] <= now - 60:
+            self.window.popleft()
+        return self.rate - len(self.window)
+
+    def claim(self, limit):
+        """
+        Takes up to limit due messages in a short transaction. Their
+        send_after moves to the retry time of a failure, so other
+        workers skip them while they are sent, and the messages of a
+        worker that dies meanwhile are retried later.
+        """
+        with transaction.atomic():
+            emails = list(
+                pending().filter(send_after__lte=timezone.now())
+                .order_by('send_after')
+                .select_for_update(skip_locked=True)[:limit]
+            )
+            for email in emails:
+                email.send_after = retry_time(email.attempts + 1)
+            Email.objects.bulk_update(emails, ['send_after'])
+        return emails
+
+    def send_batch(self):
+        """
+        Sends one batch, returns (sent, failed) counts.
+        """
+        limit = min(self.batch_size, self.allowance())
+        if limit <= 0:
+            return 0, 0
+
+        emails = self.claim(limit)
+        if not emails:
+            return 0, 0
+
+        sent, failed, latency = [], [], 0
+        try:
+            connection = get_connection(settings.OUTBOX_EMAIL_BACKEND)
+            connection.open()
+        except Exception as e:
+            # the whole batch failed, it is retried with backoff
+            failed = [fail(email, e) for email in emails]
+        else:
+            try:
+                for email in emails:
+                    start = time.monotonic()
+                    try:
+                        connection.send_messages([email.to_message()])
+                    except Exception as e:
+                        failed.append(fail(email, e))
+                    else:
+                        sent.append(email.id)
+                    latency += time.monotonic() - start
+                    self.window.append(time.monotonic())
+            finally:
+                connection.close()
+
+        Email.objects.filter(id__in=sent).update(sent=timezone.now())
+        Email.objects.bulk_update(failed, ['attempts', 'error', 'send_after'])
+
+        logger.info(
+            'outbox: sent=%d failed=%d latency=%.3fs depth=%d',
+            len(sent), len(failed), latency / len(emails), pending().count()
+        )
+        return len(sent), len(failed)
+
+
+def retry_time(attempts):
+    return timezone.now() + timedelta(minutes=2 ** attempts)
+
+
+def fail(email, error):
+    email.attempts += 1
+    email.error = str(error)
+    email.send_after = retry_time(email.attempts)
+    return email
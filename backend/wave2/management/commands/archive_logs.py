@@ -0,0 +1,65 @@
+import gzip
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from wave2.export import as_ndjson, chunked
+from wave2.models import Log
+
+COLUMNS = {
+    'id': lambda log: log.id,
+    'user': lambda log: log.user_id,
+    'action': lambda log: log.action,
+    'date': lambda log: log.date.isoformat(),
+}
+
+
+def next_month(month):
+    naive = timezone.make_naive(month)
+    return timezone.make_aware((naive + timedelta(days=32)).replace(day=1))
+
+
+def collect(logs, ids, chunk_size):
+    """
+    Yields the logs, noting their ids.
+    """
+    for log in chunked(logs, chunk_size):
+        ids.append(log.id)
+        yield log
+
+
+class Command(BaseCommand):
+    help = ('Moves the log entries older than --days to gzipped NDJSON '
+            'files, one per month, in --directory.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90)
+        parser.add_argument('--directory', type=Path, default='log_archive')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        directory = options['directory']
+        directory.mkdir(parents=True, exist_ok=True)
+
+        size = options['chunk_size']
+        old = Log.objects.filter(date__lt=cutoff)
+        total = 0
+        for month in old.datetimes('date', 'month'):
+            # a date range, which the (date, user) index answers
+            logs = old.filter(date__gte=month, date__lt=next_month(month))
+            path = directory / f'log-{month:%Y-%m}.ndjson.gz'
+            ids = []
+            # a later run for the same month appends another gzip member
+            with gzip.open(path, 'at', encoding='utf-8') as archive:
+                for line in as_ndjson(collect(logs, ids, size), COLUMNS):
+                    archive.write(line)
+            # deleted only once the file is complete
+            for i in range(0, len(ids), size):
+                Log.objects.filter(pk__in=ids[i:i + size]).delete()
+            total += len(ids)
+            self.stdout.write(f'{len(ids)} entries to {path}')
+
+        self.stdout.write(self.style.SUCCESS(f'{total} entries archived'))
@@ -0,0 +1,219 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from wave2 import authentication, versions, waitlist
+from wave2.config import config
+from wave2.models import Team, Technology, User
+from wave2.signals import teams_bulk_changed
+
+# columns of the form export, in order
+COLUMNS = ('name', 'users', 'github_link', 'project_name',
+           'project_description', 'technologies')
+FIELDS = 'github_link', 'project_name', 'project_description'
+
+
+def records(lines):
+    """
+    Yields (line number, fields) for every team of the export.
+    Descriptions may span several lines, so the fields of a line are
+    added to the previous one until all columns are there.
+    """
+    row, start = [], None
+    for number, line in enumerate(lines, 1):
+        fields = line.rstrip('\r\n').split('\t')
+        if row:
+            row[-1] += '\n' + fields[0]
+            row.extend(fields[1:])
+        elif line.strip():
+            row, start = fields, number
+        if len(row) >= len(COLUMNS):
+            yield start, row
+            row = []
+    if row:
+        yield start, row
+
+
+def normalize(name):
+    return ' '.join(name.split()).casefold()
+
+
+def split(names):
+    return [name for name in map(str.strip, names.split(',')) if name]
+
+
+class Command(BaseCommand):
+    help = ('Creates or updates (by name) the teams from the tab separated '
+            'roster export and links their members and technologies.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='geri.csv')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='only print what would change')
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        self.users, self.names = {}, {}
+        for user in User.objects.only('first_name', 'last_name', 'form'):
+            key = normalize(f'{user.first_name} {user.last_name}'), user.form
+            # None marks a name shared by several users
+            self.users[key] = None if key in self.users else user
+            self.names[user.id] = str(user)
+        technologies = dict(Technology.objects.values_list('name', 'id'))
+        teams = {team.name: team for team in Team.objects.all()}
+        before = {}
+        for team_id, user_id in Team.users.through.objects.values_list(
+                'team', 'user'):
+            before.setdefault(team_id, set()).add(user_id)
+
+        new, changed, members, tags = [], [], {}, {}
+        with open(options['path'], encoding='utf-8', newline='') as f:
+            for line, row in records(f):
+                try:
+                    data = self.parse(row)
+                except ValidationError as e:
+                    self.stderr.write(f'line {line} rejected: '
+                                      f'{" ".join(e.messages)}')
+                    continue
+
+                team = teams.get(data['name'])
+                if team is None:
+                    team = teams[data['name']] = Team(name=data['name'])
+                    new.append(team)
+                    self.stdout.write(f'+ {team.name}')
+                elif diff := [field for field in FIELDS
+                              if getattr(team, field) != data[field]]:
+                    changed.append(team)
+                    self.stdout.write(f'~ {team.name}: {", ".join(diff)}')
+                for field in FIELDS:
+                    setattr(team, field, data[field])
+
+                members[team.id] = self.match(line, data['users'])
+                self.diff(before.get(team.id, set()), members[team.id])
+                tags[team.id] = set()
+                for name in split(data['technologies']):
+                    if name in technologies:
+                        tags[team.id].add(technologies[name])
+                    else:
+                        self.stderr.write(f'line {line}: unknown '
+                                          f'technology {name}')
+
+        Team.objects.bulk_create(new, batch_size=500)
+        Team.objects.bulk_update(changed, FIELDS, batch_size=500)
+        self.link(members, tags)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(new)} teams created, {len(changed)} updated'
+        ))
+        if options['dry_run']:
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def parse(row):
+        if len(row) != len(COLUMNS):
+            raise ValidationError(
+                f'expected {len(COLUMNS)} columns, got {len(row)}'
+            )
+        data = dict(zip(COLUMNS, (value.strip() for value in row)))
+        team = Team(**{field: data[field] for field in ('name',) + FIELDS})
+        try:
+            team.clean_fields(exclude=['captain'])
+        except ValidationError as e:
+            raise ValidationError([
+                f'{field}: {" ".join(messages)}'
+                for field, messages in e.message_dict.items()
+            ])
+        return data
+
+    def match(self, line, names):
+        """
+        Returns the ids of the users in a 'Name - form, ...' list.
+        """
+        ids = []
+        for member in split(names):
+            name, _, form = member.rpartition(' - ')
+            user = self.users.get((normalize(name), form.strip()))
+            if user:
+                ids.append(user.id)
+            else:
+                self.stderr.write(f'line {line}: no single user {member}')
+        return ids
+
+    def diff(self, before, after):
+        for user_id in after:
+            if user_id not in before:
+                self.stdout.write(f'  + {self.names[user_id]}')
+        for user_id in before - set(after):
+            self.stdout.write(f'  - {self.names[user_id]}')
+
+    @staticmethod
+    def link(members, tags):
+        """
+        Replaces the members and technologies of the imported teams
+        with bulk inserts, moving users out of their other teams.
+        """
+        Membership = Team.users.through
+        user_ids = {user_id for ids in members.values() for user_id in ids}
+        left = set(
+            Membership.objects.filter(user__in=user_ids)
+            .exclude(team__in=members).values_list('team', flat=True)
+        )
+        teams = Team.objects.filter(id__in=left | set(members))
+        # whose team or captaincy may change, for their cached claims
+        touched = user_ids | set(
+            Membership.objects.filter(team__in=teams)
+            .values_list('user', flat=True)
+        )
+        Membership.objects.filter(team__in=members).delete()
+        Membership.objects.filter(user__in=user_ids).delete()
+        Membership.objects.bulk_create([
+            Membership(team_id=team_id, user_id=user_id)
+            for team_id, ids in members.items() for user_id in set(ids)
+        ], batch_size=1000)
+
+        Tags = Team.technologies.through
+        Tags.objects.filter(team__in=tags).delete()
+        Tags.objects.bulk_create([
+            Tags(team_id=team_id, technology_id=technology_id)
+            for team_id, ids in tags.items() for technology_id in ids
+        ], batch_size=1000)
+
+        # the bulk inserts bypass m2m_changed
+        Team.recount_members(teams)
+        User.recount_teams(User.objects.filter(id__in=touched))
+        Command.update_status(teams, left)
+
+        # the captain stays if still a member, else the first one listed
+        captains = []
+        for team in teams.prefetch_related('users'):
+            ids = sorted(user.id for user in team.users.all())
+            if team.captain_id not in ids:
+                listed = [i for i in members.get(team.id, ()) if i in ids]
+                team.captain_id = (listed or ids or [None])[0]
+                captains.append(team)
+        Team.objects.bulk_update(captains, ['captain'], batch_size=500)
+        User.objects.filter(id__in=touched).update(is_captain=False)
+        User.objects.filter(captain_of__in=teams).update(is_captain=True)
+        # the bulk updates send no signals
+        versions.bump(Team, User)
+        authentication.invalidate(*touched)
+        teams_bulk_changed.send(sender=Team)
+
+    @staticmethod
+    def update_status(teams, left):
+        """
+        Deletes the teams that the import left without members, like
+        leave_team does, and takes the teams with too few members out
+        of the confirmed teams and the queue. The freed places go to
+        the waiting teams.
+        """
+        waitlist.lock()
+        empty = teams.filter(id__in=left, member_count=0)
+        below = teams.filter(member_count__lt=config.min_users_in_team)
+        freed = (empty | below).filter(confirmed=True).exists()
+        empty.delete()
+        # the deleted teams are gone, an exclude() would make this a
+        # subquery on the updated table, which MySQL rejects (1093)
+        below.update(is_full=False, confirmed=False, ready=None)
+        if freed:
+            waitlist.promote()
@@ -0,0 +1,81 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+from django.utils.html import strip_tags
+
+from wave2.models import User
+
+RECIPIENTS = {
+    'active': lambda: User.objects.filter(is_active=True),
+    'in_team': lambda: User.objects.exclude(current_team=None),
+    'captains': lambda: User.objects.exclude(captain_of=None),
+    'confirmed_captains':
+        lambda: User.objects.filter(captain_of__confirmed=True),
+}
+
+
+class Command(BaseCommand):
+    help = ('Sends an announcement to a group of participants. '
+            'The templates get the recipient as `user` in their context.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('subject')
+        parser.add_argument('html_template')
+        parser.add_argument('--text-template',
+                            help='plain text version, stripped html if not set')
+        parser.add_argument('--to', choices=RECIPIENTS, default='active')
+        parser.add_argument('--chunk-size', type=int, default=100)
+        parser.add_argument('--progress',
+                            help='file with the last mailed user id; '
+                                 'a rerun continues after it')
+        parser.add_argument('--direct', action='store_true',
+                            help='send through OUTBOX_EMAIL_BACKEND instead '
+                                 'of queueing in the outbox')
+
+    def handle(self, *args, **options):
+        html_template = get_template(options['html_template'])
+        text_template = (options['text_template'] and
+                         get_template(options['text_template']))
+
+        progress = options['progress'] and Path(options['progress'])
+        users = (RECIPIENTS[options['to']]().exclude(email=None)
+                 .distinct().order_by('id'))
+        if progress and progress.exists():
+            users = users.filter(id__gt=int(progress.read_text()))
+        users = users.only('id', 'email', 'first_name', 'last_name', 'form')
+
+        connection = get_connection(
+            settings.OUTBOX_EMAIL_BACKEND if options['direct'] else None
+        )
+        sent = 0
+        with connection:
+            chunk = []
+            for user in users.iterator(chunk_size=options['chunk_size']):
+                context = {'user': user}
+                html = html_template.render(context)
+                text = (text_template.render(context) if text_template
+                        else strip_tags(html))
+                message = EmailMultiAlternatives(
+                    options['subject'], text, settings.EMAIL_FROM_ADDRESS,
+                    [user.email], connection=connection,
+                )
+                message.attach_alternative(html, 'text/html')
+                chunk.append((user.id, message))
+
+                if len(chunk) == options['chunk_size']:
+                    sent += self.send(connection, chunk, progress)
+                    chunk = []
+            if chunk:
+                sent += self.send(connection, chunk, progress)
+
+        self.stdout.write(self.style.SUCCESS(f'{sent} mails sent'))
+
+    def send(self, connection, chunk, progress):
+        sent = connection.send_messages([message for _, message in chunk])
+        if progress:
+            progress.write_text(str(chunk[-1][0]))
+        self.stdout.write(f'mailed up to user {chunk[-1][0]}')
+        return sent
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from wave2 import authentication, versions
+from wave2.models import Team, User
+from wave2.signals import teams_bulk_changed
+
+
+class Command(BaseCommand):
+    help = ('Deletes teams without members, makes sure every team has '
+            'exactly one captain, who is one of its members, and rebuilds '
+            'the membership counters.')
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        empty = Team.objects.filter(users=None)
+        empty_count = empty.count()
+
+        teams = []
+        for team in Team.objects.exclude(users=None).prefetch_related('users'):
+            users = sorted(team.users.all(), key=lambda user: user.id)
+            if team.captain_id in {user.id for user in users}:
+                continue
+            captains = [user for user in users if user.is_captain] or users
+            team.captain = captains[0]
+            teams.append(team)
+
+        empty.delete()
+        Team.objects.bulk_update(teams, ['captain'], batch_size=500)
+        # the flag follows the column - one UPDATE per direction
+        User.objects.filter(is_captain=True, captain_of=None).update(
+            is_captain=False
+        )
+        User.objects.filter(is_captain=False).exclude(
+            captain_of=None
+        ).update(is_captain=True)
+
+        Team.recount_members(Team.objects.all())
+        User.recount_teams(User.objects.all())
+        # the bulk updates send no signals
+        versions.bump(Team, User)
+        authentication.invalidate(*User.objects.values_list('id', flat=True))
+        teams_bulk_changed.send(sender=Team)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{empty_count} empty teams deleted, '
+            f'{len(teams)} captains repaired'
+        ))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from wave2.mail import Outbox, pending
+
+
+class Command(BaseCommand):
+    help = 'Delivers the mail waiting in the outbox.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--interval', type=float, default=5,
+                            help='seconds to wait when the outbox is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='send what is due now and exit')
+
+    def handle(self, *args, **options):
+        outbox = Outbox(options['batch_size'])
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = outbox.send_batch()
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{total_sent} sent, {total_failed} failed, '
+            f'{pending().count()} pending'
+        ))
@@ -0,0 +1,33 @@
+# Generated by Django 3.1 on 2026-10-17 19:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def set_captains(apps, schema_editor):
+    Team = apps.get_model('wave2', 'Team')
+    teams = []
+    for team in Team.objects.prefetch_related('users'):
+        users = sorted(team.users.all(), key=lambda user: user.id)
+        captains = [user for user in users if user.is_captain] or users
+        if captains:
+            team.captain = captains[0]
+            teams.append(team)
+    Team.objects.bulk_update(teams, ['captain'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wave2', '0023_registereduser'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='captain',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='captain_of', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(set_captains, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.1 on 2026-10-17 19:03
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def count_members(apps, schema_editor):
+    Team = apps.get_model('wave2', 'Team')
+    User = apps.get_model('wave2', 'User')
+    Membership = Team.users.through
+
+    members = (
+        Membership.objects.filter(team=OuterRef('pk'))
+        .values('team').annotate(count=Count('user')).values('count')
+    )
+    Team.objects.update(member_count=Coalesce(Subquery(members), 0))
+    teams = Membership.objects.filter(user=OuterRef('pk')).values('team')
+    User.objects.update(current_team=Subquery(teams[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wave2', '0024_team_captain'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='member_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='current_team',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='wave2.team'),
+        ),
+        migrations.RunPython(count_members, migrations.RunPython.noop),
+    ]
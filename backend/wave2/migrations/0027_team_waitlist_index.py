@@ -0,0 +1,17 @@
+# Generated by Django 3.1 on 2026-10-17 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wave2', '0026_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(fields=['confirmed', 'ready'], name='wave2_team_confirm_1d82f1_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.1 on 2026-10-17 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wave2', '0027_team_waitlist_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(fields=['date_joined', 'id'], name='wave2_team_date_jo_b0dafc_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.1 on 2026-10-17 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wave2', '0028_team_date_joined_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(fields=['project_name'], name='wave2_team_project_d92dc2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['first_name'], name='wave2_user_first_n_273c07_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['last_name'], name='wave2_user_last_na_c783f8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['form'], name='wave2_user_form_bf73db_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.1 on 2026-10-17 19:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wave2', '0029_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='log',
+            index=models.Index(fields=['date', 'user'], name='wave2_log_date_b6bd8d_idx'),
+        ),
+    ]
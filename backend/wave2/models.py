@@ -1,9 +1,15 @@
-import pickle
 import uuid
 
 from django.contrib.auth.models import AbstractUser
+from django.core.mail import EmailMultiAlternatives
 from django.core.validators import RegexValidator
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import choices, versions
+from .config import config
 
 
 class BaseDate(models.Model):
@@ -60,11 +66,9 @@ class User(AbstractUser):
     AbstractUser._meta.get_field('username')._unique = False
     AbstractUser._meta.get_field('is_active').default = False
 
-    with open('choices.bytes', 'rb') as f:
-        choices = pickle.load(f)
-    FORMS = choices['FORMS']
-    FOOD_PREFERENCES = choices['FOOD_PREFERENCES']
-    SIZES = choices['SIZES']
+    FORMS = choices.FORMS
+    FOOD_PREFERENCES = choices.FOOD_PREFERENCES
+    SIZES = choices.SIZES
 
     USERNAME_FIELD = 'email'
 
@@ -82,14 +86,42 @@ class User(AbstractUser):
     discord_id = models.BigIntegerField(unique=True, null=True)
     is_online = models.BooleanField(default=False)
     is_captain = models.BooleanField(default=False)
+    current_team = models.ForeignKey('Team', blank=True, null=True,
+                                     editable=False,
+                                     on_delete=models.SET_NULL,
+                                     related_name='+')
 
     REQUIRED_FIELDS = [
         'first_name', 'last_name', 'form', 'tshirt_size',
     ]
 
+    class Meta(AbstractUser.Meta):
+        # prefix searches by name, see filters.py
+        indexes = [
+            models.Index(fields=['first_name']),
+            models.Index(fields=['last_name']),
+            models.Index(fields=['form']),
+        ]
+
     @property
     def has_team(self):
-        return bool(self.team_set.count())
+        return self.current_team_id is not None
+
+    def refresh_from_db(self, using=None, fields=None):
+        # a deferred field brings the others along, see authentication.py
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred.issuperset(fields):
+            fields = deferred
+        super().refresh_from_db(using, fields)
+
+    @staticmethod
+    def recount_teams(users):
+        """
+        Rewrites current_team of the users in the queryset with one UPDATE.
+        """
+        teams = Team.users.through.objects.filter(user=OuterRef('pk'))
+        users.update(current_team=Subquery(teams.values('team')[:1]))
+        versions.bump(User)
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.form}"
@@ -103,6 +135,59 @@ class Log(models.Model):
     action = models.JSONField()
     date = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['date', 'user'])]
+
+
+class Email(models.Model):
+    """
+    Outgoing mail, stored by OutboxBackend and delivered by the
+    send_emails command.
+    """
+    subject = models.TextField()
+    body = models.TextField()
+    alternatives = models.JSONField(default=list)
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list)
+    bcc = models.JSONField(default=list)
+
+    created = models.DateTimeField(auto_now_add=True)
+    send_after = models.DateTimeField(default=timezone.now)
+    sent = models.DateTimeField(blank=True, null=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['sent', 'send_after'])]
+
+    @classmethod
+    def from_message(cls, message):
+        return cls(
+            subject=message.subject,
+            body=message.body,
+            alternatives=[
+                list(alternative)
+                for alternative in getattr(message, 'alternatives', [])
+            ],
+            from_email=message.from_email,
+            to=message.to,
+            cc=message.cc,
+            bcc=message.bcc,
+        )
+
+    def to_message(self, connection=None):
+        message = EmailMultiAlternatives(
+            self.subject, self.body, self.from_email,
+            self.to, self.bcc, connection=connection, cc=self.cc,
+        )
+        for content, mimetype in self.alternatives:
+            message.attach_alternative(content, mimetype)
+        return message
+
+    def __str__(self):
+        return self.subject
+
 
 class Team(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -116,34 +201,53 @@ class Team(models.Model):
     project_description = models.TextField(blank=True)
     technologies = models.ManyToManyField(Technology, blank=True)
 
+    captain = models.ForeignKey(User, blank=True, null=True,
+                                on_delete=models.SET_NULL,
+                                related_name='captain_of')
+
     ready = models.DateTimeField(blank=True, null=True)
     confirmed = models.BooleanField(default=False)
+    member_count = models.PositiveSmallIntegerField(default=0,
+                                                    editable=False)
 
     date_joined = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['confirmed', 'ready']),
+            models.Index(fields=['date_joined', 'id']),
+            models.Index(fields=['project_name']),
+        ]
+
     @property
     def is_confirmed(self):
-        min_users = SmallInteger.objects.get(name='min_users_in_team').value
-        return self.users.count() >= min_users
-        
-    @property
-    def captain(self):
-        if not self.users.count():
-            self.delete()
-        try:
-            captain = self.users.get(is_captain=True)
-        except User.MultipleObjectsReturned:
-            for user in self.users.all():
-                user.is_captain = False
-                user.save()
-            captain = self.users.first()
-            captain.is_captain = True
-            captain.save()
-        except User.DoesNotExist:
-            captain = self.users.first()
+        min_users = config.min_users_in_team
+        return self.member_count >= min_users
+
+    def hand_over_captaincy(self):
+        """
+        Makes the longest registered member captain,
+        returns None if there is no one left in the team.
+        """
+        captain = self.users.order_by('id').first()
+        if captain:
             captain.is_captain = True
-            captain.save()
-        return captain.id
+            captain.save(update_fields=['is_captain'])
+            self.captain = captain
+            self.save(update_fields=['captain'])
+        return captain
+
+    @staticmethod
+    def recount_members(teams):
+        """
+        Rewrites member_count of the teams in the queryset with one UPDATE.
+        """
+        members = (
+            Team.users.through.objects.filter(team=OuterRef('pk'))
+            .values('team').annotate(count=Count('user')).values('count')
+        )
+        teams.update(member_count=Coalesce(Subquery(members), 0))
+        versions.bump(Team)
 
     def __str__(self):
         return self.name
@@ -0,0 +1,17 @@
+from rest_framework import pagination
+
+
+class CursorPagination(pagination.CursorPagination):
+    """
+    Pages by the `ordering` of the view, which should be unique and
+    backed by an index, so a deep page costs as much as the first one.
+    Clients may ask for up to max_page_size rows with ?page_size=.
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = 'id'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'ordering', self.ordering)
+        return (ordering,) if isinstance(ordering, str) else tuple(ordering)
@@ -1,8 +1,60 @@
 from datetime import date
 
+from django.utils.functional import cached_property
 from rest_framework import permissions
 
-from wave2.models import FieldValidationDate
+from wave2.config import config
+
+
+class AuthorizationContext:
+    """
+    What the permission checks need to know about the user of a request.
+    Every value is computed on first use and kept for the request.
+    """
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def user_id(self):
+        return self.user.pk
+
+    @cached_property
+    def team_id(self):
+        return getattr(self.user, 'current_team_id', None)
+
+    @property
+    def has_team(self):
+        return self.team_id is not None
+
+    @cached_property
+    def team_editable(self):
+        return not team_not_editable()
+
+    @cached_property
+    def team_ids(self):
+        return set(self.user.team_set.values_list('pk', flat=True))
+
+    def is_member_of(self, team):
+        return self.team_id == team.pk or team.pk in self.team_ids
+
+    def is_captain_of(self, team):
+        if self.user_id is None or not self.is_member_of(team):
+            return False
+        if team.captain_id is None:
+            # a member with the captain flag whose team lacks the column
+            return bool(self.user.is_captain)
+        return team.captain_id == self.user_id
+
+
+def context(request):
+    """
+    Returns the AuthorizationContext of the request, made on first call.
+    """
+    try:
+        return request.authorization_context
+    except AttributeError:
+        request.authorization_context = AuthorizationContext(request.user)
+        return request.authorization_context
 
 
 class UserPermissions(permissions.BasePermission):
@@ -19,10 +71,10 @@ class UserPermissions(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
 
-        if view.action == 'leave_team' and team_not_editable():
+        if view.action == 'leave_team' and not context(request).team_editable:
             return False
 
-        if request.user == obj:
+        if context(request).user_id == obj.pk:
             return True
 
         return False
@@ -41,10 +93,10 @@ class TeamPermissions(permissions.BasePermission):
             request.method in permissions.SAFE_METHODS):
             return True
 
-        if request.method == 'DELETE' and team_not_editable():
+        if request.method == 'DELETE' and not context(request).team_editable:
             return False
-            
-        if request.method == 'POST' and request.user.team_set.count():
+
+        if request.method == 'POST' and context(request).has_team:
             return False
 
         return True
@@ -53,18 +105,12 @@ class TeamPermissions(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
 
-        if view.action == 'change_captain' and team_not_editable():
+        if (view.action == 'change_captain' and
+                not context(request).team_editable):
             return False
 
-        if (request.user.is_captain and request.user.team_set.first() == obj
-            or request.method in permissions.SAFE_METHODS):
-            return True
-
-        return False
+        return context(request).is_captain_of(obj)
 
 
 def team_not_editable():
-    return (
-        FieldValidationDate.objects.get(field='team_editable').date <
-        date.today()
-    )
+    return config.team_editable < date.today()
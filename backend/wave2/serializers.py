@@ -1,11 +1,13 @@
 from collections import OrderedDict
 from datetime import date
 
-from django.utils import timezone
 from django_email_verification import send_email as sendConfirm
 from rest_framework import serializers
 
-from .models import FieldValidationDate, SmallInteger, Team, Technology, User
+from . import bulk, waitlist
+from .config import config
+from .models import Log, Team, Technology, User
+from .sparse import SparseFieldsSerializerMixin
 
 
 class ModifiedRelatedField(serializers.RelatedField):
@@ -51,101 +53,136 @@ class TechnologyField(serializers.StringRelatedField):
         return Technology.objects.get(name=data)
 
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(SparseFieldsSerializerMixin,
+                     serializers.ModelSerializer):
     users = UserField(many=True)
     technologies = TechnologyField(many=True)
+    expandable = ('users',)
 
     class Meta:
         model = Team
         fields = ('id', 'name', 'github_link', 'is_full', 'confirmed',
                   'project_name', 'project_description', 'users',
                   'technologies', 'captain')
-        read_only_fields = 'confirmed',
+        read_only_fields = 'confirmed', 'captain'
 
     def create(self, validated_data):
         self.check_editable()
-        max_teams = SmallInteger.objects.get(name='max_teams').value
         users = validated_data.get('users')
         self.check_users_count(users)
-        self.check_not_in_team(users)
+        captain = validated_data.get('captain')
+        self.check_not_in_team(
+            self.lock_users(users + [captain] if captain else users)
+        )
 
         instance = super().create(validated_data)
 
         if instance.is_confirmed is False:
             instance.is_full = False
-        elif Team.objects.filter(confirmed=True).count() > max_teams:
-            instance.ready = timezone.now()
+            instance.save()
         else:
-            instance.confirmed = instance.is_confirmed
+            waitlist.admit(instance)
 
-        instance.save()
         return instance
 
     def update(self, instance, validated_data):
+        self.lock_team(instance)
         if users := validated_data.get('users'):
             self.check_users_count(users)
-            before = [user for user in instance.users.all()]
-            after = users
+            before = set(User.objects.filter(team=instance))
+            after = set(users)
             if before != after:
                 self.check_editable()
-                users = [user for user in after if user not in before]
-            else:
-                users = []
-            if users:
-                self.check_not_in_team(users)
-
-        was_confirmed = instance.confirmed
-        max_teams = SmallInteger.objects.get(name='max_teams').value
+            if users := after - before:
+                self.check_not_in_team(self.lock_users(users))
 
         instance = super().update(instance, validated_data)
+        if 'users' in validated_data:
+            self.check_captain(instance, validated_data['users'])
 
         if instance.is_confirmed is False:
-            instance.is_full = False
-            instance.confirmed = False
-            instance.ready = None
-            instance.save()
-            if was_confirmed:
-                team = Team.objects.filter(ready__lte=timezone.now()).first()
-                if team:
-                    team.ready = None
-                    team.confirmed = True
-                    team.save()
-        elif Team.objects.filter(confirmed=True).count() > max_teams:
-            instance.ready = timezone.now()
+            waitlist.drop(instance)
         else:
-            instance.confirmed = instance.is_confirmed
-            instance.save()
+            waitlist.admit(instance)
 
         return instance
 
+    @staticmethod
+    def lock_team(team):
+        """
+        Holds the team row until the end of the transaction, so edits
+        of one team are applied one after another.
+        """
+        Team.objects.select_for_update().filter(pk=team.pk).first()
+
+    @staticmethod
+    def check_captain(team, users):
+        """
+        Hands the captaincy over to a remaining member if the captain
+        was removed from the team.
+        """
+        if (team.captain_id is None or
+                team.captain_id in {user.id for user in users}):
+            return
+        team.captain.is_captain = False
+        team.captain.save(update_fields=['is_captain'])
+        if not team.hand_over_captaincy():
+            team.captain = None
+            team.save(update_fields=['captain'])
+
+    @staticmethod
+    def lock_users(users):
+        """
+        Holds the user rows until the end of the transaction and
+        returns them freshly read, so two teams cannot take the
+        same user at once.
+        """
+        return list(
+            User.objects.select_for_update().order_by('id')
+            .filter(id__in=[user.id for user in users])
+        )
+
     @staticmethod
     def check_users_count(users):
-        max_users = SmallInteger.objects.get(name='max_users_in_team').value
+        max_users = config.max_users_in_team
         if len(users) > max_users:
             err = 'reached maximum users in team limit'
             raise serializers.ValidationError(err)
 
     @staticmethod
     def check_editable():
-        editable = FieldValidationDate.objects.get(field='team_editable').date
+        editable = config.team_editable
         if editable < date.today():
             err = f'team is not editable after {editable}'
             raise serializers.ValidationError(err)
 
     @staticmethod
     def check_not_in_team(users):
-        if any(user.team_set.count() for user in users):
+        if any(user.has_team for user in users):
             err = 'one of the users already has team'
             raise serializers.ValidationError(err)
 
 
+class BulkTeamSerializer(serializers.Serializer):
+    operation = serializers.ChoiceField(choices=list(bulk.OPERATIONS))
+    teams = serializers.ListField(child=serializers.UUIDField(),
+                                  allow_empty=False)
+
+
 class TechnologySerializer(serializers.ModelSerializer):
     class Meta:
         model = Technology
         fields = '__all__'
 
 
-class UserSerializer(serializers.ModelSerializer):
+class LogSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Log
+        fields = 'id', 'user', 'action', 'date'
+
+
+class UserSerializer(SparseFieldsSerializerMixin,
+                     serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'is_active', 'first_name', 'last_name', 'email',
@@ -158,7 +195,7 @@ class UserSerializer(serializers.ModelSerializer):
     @staticmethod
     def confirm_user(user):
         try:
-            sendConfirm(user)
+            sendConfirm(user, thread=False)  # only queued in the outbox
         except Exception as e:
             with open('email_log.txt', 'a') as f:
                 f.write(str(e) + '\n')
@@ -191,22 +228,21 @@ class UserSerializer(serializers.ModelSerializer):
         """
         some fields should not be editable after specific date
         """
-        for field_object in FieldValidationDate.objects.all():
-            field = field_object.field
+        for field, field_date in config.dates.items():
             # new_value = validaed_data.get(field) if field in validated_data
             if new_value := self.initial_data.get(field):
                 try:
                     initial_value = getattr(self.instance, field)
                 except AttributeError:
-                    if field_object.date < date.today():
-                        err = f'users not creatable after {field_object.date}'
+                    if field_date < date.today():
+                        err = f'users not creatable after {field_date}'
                         raise serializers.ValidationError(err)
                     else:
                         continue
 
                 if initial_value != new_value:
-                    if field_object.date < date.today():
-                        er = f'{field} was editable untill {field_object.date}'
+                    if field_date < date.today():
+                        er = f'{field} was editable untill {field_date}'
                         raise serializers.ValidationError(er)
 
         return super().is_valid(*args, **kwargs)
@@ -0,0 +1,102 @@
+from django.core.signals import request_finished, request_started
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import Signal, receiver
+
+from . import authentication, versions
+from .config import config
+from .models import FieldValidationDate, SmallInteger, Team, Technology, User
+
+# sent by the bulk changes of the teams and their members, which send no
+# post_save or m2m_changed
+teams_bulk_changed = Signal()
+
+
+@receiver(request_started)
+def expire_config(**kwargs):
+    config.expire()
+
+
+@receiver(request_started)
+def start_request(**kwargs):
+    versions.start_request()
+
+
+@receiver(request_finished)
+def end_request(**kwargs):
+    versions.end_request()
+
+
+@receiver(post_save, sender=SmallInteger)
+@receiver(post_delete, sender=SmallInteger)
+@receiver(post_save, sender=FieldValidationDate)
+@receiver(post_delete, sender=FieldValidationDate)
+def invalidate_config(**kwargs):
+    config.invalidate()
+
+
+@receiver(m2m_changed, sender=Team.users.through)
+def count_members(instance, action, reverse, pk_set, **kwargs):
+    """
+    Keeps Team.member_count and User.current_team in step with the
+    membership table.
+    """
+    related = instance.team_set if reverse else instance.users
+    if action == 'pre_clear':
+        # clear() does not report what it removes
+        instance._cleared_pks = set(related.values_list('pk', flat=True))
+        return
+    if action == 'post_clear':
+        pk_set = instance.__dict__.pop('_cleared_pks', set())
+    elif action not in ('post_add', 'post_remove'):
+        return
+
+    if reverse:
+        teams = Team.objects.filter(pk__in=pk_set)
+        user_ids = [instance.pk]
+    else:
+        teams = Team.objects.filter(pk=instance.pk)
+        user_ids = pk_set
+    Team.recount_members(teams)
+    User.recount_teams(User.objects.filter(pk__in=user_ids))
+    authentication.invalidate(*user_ids)
+
+    instance.refresh_from_db(
+        fields=['current_team' if reverse else 'member_count']
+    )
+
+
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Technology)
+@receiver(post_delete, sender=Technology)
+def bump_version(sender, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'last_login', 'is_online'}:
+        return  # not shown in the versioned responses
+    versions.bump(sender)
+
+
+@receiver(m2m_changed, sender=Team.technologies.through)
+def bump_team_version(action, **kwargs):
+    # membership changes are bumped by the recounts in count_members
+    if action.startswith('post_'):
+        versions.bump(Team)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_claims(instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'last_login', 'is_online'}:
+        return
+    authentication.invalidate(instance.pk)
+
+
+@receiver(pre_delete, sender=Team)
+def invalidate_member_claims(instance, **kwargs):
+    # the members lose the team by the FK cascade, which sends no signals
+    user_ids = set(instance.users.values_list('id', flat=True))
+    if instance.captain_id is not None:
+        user_ids.add(instance.captain_id)
+    authentication.invalidate(*user_ids)
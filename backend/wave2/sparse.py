@@ -0,0 +1,76 @@
+"""
+Sparse fieldsets for the read endpoints.
+
+?fields=id,name renders only the listed fields and ?expand=users renders
+only the listed expandable relations as objects, the other ones as ids.
+The viewset prefetches only what the requested fields need.
+"""
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def query_list(request, name):
+    """
+    The comma separated values of a query parameter as a set,
+    None if it is not given.
+    """
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return {item for item in map(str.strip, value.split(',')) if item}
+
+
+def requested(request):
+    """
+    Returns the (fields, expand) sets of a read request,
+    None for the ones that are not limited.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None, None
+    return query_list(request, 'fields'), query_list(request, 'expand')
+
+
+class SparseFieldsSerializerMixin:
+    """
+    `expandable` lists the related fields rendered as ids
+    when they are missing from ?expand=.
+    """
+    expandable = ()
+
+    def get_fields(self):
+        fields = super().get_fields()
+        only, expand = requested(self.context.get('request'))
+        if only is not None:
+            for name in set(fields) - only:
+                del fields[name]
+        if expand is not None:
+            for name in (set(self.expandable) & set(fields)) - expand:
+                fields[name] = serializers.PrimaryKeyRelatedField(
+                    many=True, read_only=True
+                )
+        return fields
+
+
+class SparseFieldsViewMixin:
+    """
+    `prefetch` maps a field to its prefetch_related lookup, used only
+    when the field is rendered. An expandable field that is not expanded
+    only needs the ids of the related rows.
+    """
+    prefetch = {}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        only, expand = requested(self.request)
+        expandable = self.get_serializer_class().expandable
+        lookups = []
+        for field, lookup in self.prefetch.items():
+            if only is not None and field not in only:
+                continue
+            if expand is not None and field in expandable and (
+                    field not in expand):
+                related = queryset.model._meta.get_field(field).related_model
+                lookup = Prefetch(field, related.objects.only('pk'))
+            lookups.append(lookup)
+        return queryset.prefetch_related(*lookups)
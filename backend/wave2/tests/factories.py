@@ -0,0 +1,45 @@
+"""
+Users and teams for the tests, numbered after the existing ones, so a
+test can call the factories several times.
+"""
+from wave2 import models
+
+
+def create_users(count, team=None):
+    """
+    Creates count users and adds them to the team, if one is given.
+    """
+    start = models.User.objects.count()
+    users = [
+        models.User.objects.create(username=f'user#{i}',
+                                   email=f'user{i}@abv.bg')
+        for i in range(start, start + count)
+    ]
+    if team:
+        team.users.add(*users)
+    return users
+
+
+def create_teams(count, members=3, technologies=(), first_name='First',
+                 last_name='Last', **fields):
+    """
+    Creates count teams of `members` users named first_name and
+    last_name followed by their number in the team. The first user is
+    the captain. fields are set on every user.
+    """
+    start = models.Team.objects.count()
+    teams = []
+    for i in range(start, start + count):
+        users = [
+            models.User.objects.create(
+                username=f'user#{i}.{j}', email=f'user{i}.{j}@abv.bg',
+                first_name=first_name, last_name=f'{last_name}{j}',
+                is_captain=not j, **fields
+            )
+            for j in range(members)
+        ]
+        team = models.Team.objects.create(name=f'team{i}', captain=users[0])
+        team.users.set(users)
+        team.technologies.set(technologies)
+        teams.append(team)
+    return teams
@@ -0,0 +1,105 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from wave2 import models
+
+from .factories import create_teams, create_users
+
+
+class TestRegisteredUserAdmin(TestCase):
+    url = '/admin/wave2/registereduser/'
+
+    def setUp(self):
+        self.admin = models.User.objects.create_superuser(
+            email='admin@abv.bg', password='admin', username='admin',
+            is_active=True
+        )
+        self.client.force_login(self.admin)
+        self.team = models.Team.objects.create(name='team')
+
+    def get(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_only_users_with_team_are_listed(self):
+        members = create_users(2, self.team)
+        create_users(2)
+
+        response, _ = self.get()
+
+        self.assertEqual(
+            set(response.context['cl'].result_list),
+            set(members)
+        )
+
+    def test_query_count_does_not_depend_on_user_count(self):
+        create_users(2, self.team)
+        _, few = self.get()
+
+        create_users(10, self.team)
+        create_users(10)
+        _, many = self.get()
+
+        self.assertEqual(few, many)
+
+    def test_user_changelist_sorts_by_annotated_columns(self):
+        users = create_users(2, self.team)
+        users += create_users(2)
+        for user, first_name in zip(users, 'Dimo Asen Vasil Boris'.split()):
+            user.first_name = first_name
+            user.save()
+
+        def column(order, field):
+            response = self.client.get(f'/admin/wave2/user/?o={order}')
+            self.assertEqual(response.status_code, 200)
+            return [getattr(user, field)
+                    for user in response.context['cl'].result_list]
+
+        # o= counts the columns with the action checkbox as 0
+        names = column(3, 'full_name')
+        self.assertEqual(names, sorted(names))
+        self.assertEqual(names[1:3], ['Asen ', 'Boris '])
+        self.assertEqual(column(-3, 'full_name'), sorted(names, reverse=True))
+
+        self.assertEqual(column(9, 'in_team'), [False] * 3 + [True] * 2)
+        self.assertEqual(column(-9, 'in_team'), [True] * 2 + [False] * 3)
+
+
+class TestTeamAdmin(TestCase):
+    def setUp(self):
+        self.admin = models.User.objects.create_superuser(
+            email='admin@abv.bg', password='admin', username='admin',
+            is_active=True
+        )
+        self.client.force_login(self.admin)
+        models.SmallInteger.objects.create(name='min_users_in_team', value=2)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_changelist_query_count_does_not_depend_on_team_count(self):
+        create_teams(2, members=2)
+        self.get('/admin/wave2/team/')  # warms the config cache
+        _, few = self.get('/admin/wave2/team/')
+
+        create_teams(10, members=2)
+        response, many = self.get('/admin/wave2/team/')
+
+        self.assertEqual(few, many)
+        self.assertContains(response, 'team11')
+
+    def test_change_form_shows_captain_and_confirmation(self):
+        create_teams(1, members=2)
+        team = models.Team.objects.get()
+
+        response, _ = self.get(f'/admin/wave2/team/{team.id}/change/')
+
+        self.assertTrue(response.context['original'].is_confirmed)
+        self.assertEqual(response.context['original'].captain_name,
+                         team.captain.get_full_name())
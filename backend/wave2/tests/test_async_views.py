@@ -0,0 +1,90 @@
+import asyncio
+import time
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, Client, TransactionTestCase
+
+from wave2 import models
+
+
+# the views query from other threads, which see only committed rows
+class TestAsyncViews(TransactionTestCase):
+    def setUp(self):
+        self.client = AsyncClient()
+        self.sync_client = Client()
+        self.technology = models.Technology.objects.create(name='Python')
+        self.user = models.User.objects.create(username='user',
+                                               email='user@abv.bg',
+                                               first_name='Ivan')
+        self.teams = [models.Team.objects.create(name=f'team{i}')
+                      for i in range(3)]
+        self.teams[0].users.add(self.user)
+        self.teams[0].technologies.add(self.technology)
+
+    async def test_team_list_is_paginated(self):
+        # AsyncClient of Django 3.1 drops the data of a get
+        response = await self.client.get('/async/teams/?page_size=2')
+        data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([team['name'] for team in data['results']],
+                         ['team0', 'team1'])
+        self.assertEqual(data['results'][0]['users'][0]['id'], self.user.id)
+        self.assertEqual(data['results'][0]['technologies'], ['Python'])
+        self.assertIn('/async/teams/?cursor=', data['next'])
+
+    async def test_fields_and_search_match_the_sync_views(self):
+        response = await self.client.get('/async/teams/?q=team2&fields=name')
+
+        self.assertEqual(response.json()['results'], [{'name': 'team2'}])
+
+    async def test_details(self):
+        team = await self.client.get(f'/async/teams/{self.teams[0].id}/')
+        user = await self.client.get(f'/async/users/{self.user.id}/')
+        missing = await self.client.get('/async/users/0/')
+
+        self.assertEqual(team.json()['name'], 'team0')
+        self.assertEqual(user.json()['first_name'], 'Ivan')
+        self.assertNotIn('password', user.json())
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_writes_are_not_allowed(self):
+        response = await self.client.post('/async/teams/')
+
+        self.assertEqual(response.status_code, 405)
+
+    async def test_errors_match_the_sync_views(self):
+        for path in ('teams/?discord_id=abc', 'teams/?cursor=zzz'):
+            response = await self.client.get(f'/async/{path}')
+            expected = await sync_to_async(self.sync_client.get)(f'/{path}')
+
+            self.assertIn(response.status_code, (400, 404))
+            self.assertEqual(response.status_code, expected.status_code)
+            self.assertEqual(response.json(), expected.json())
+
+    async def test_invalid_token_is_401(self):
+        # AsyncClient of Django 3.1 takes the headers as in the ASGI scope
+        response = await self.client.get('/async/teams/', headers=[
+            (b'host', b'testserver'), (b'authorization', b'Bearer nonsense'),
+        ])
+
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response)
+
+    async def test_requests_are_served_concurrently(self):
+        def slow(view):
+            time.sleep(0.2)
+            return {}
+
+        # through all of MIDDLEWARE, a sync-only one would serialize them
+        with mock.patch('wave2.async_views.list_data', slow):
+            start = time.monotonic()
+            responses = await asyncio.gather(*(
+                self.client.get('/async/teams/') for _ in range(5)
+            ))
+            elapsed = time.monotonic() - start
+
+        self.assertEqual([response.status_code for response in responses],
+                         [200] * 5)
+        self.assertLess(elapsed, 0.6)
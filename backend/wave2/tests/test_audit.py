@@ -0,0 +1,138 @@
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+
+from django.db import transaction
+from django.test import AsyncClient, TransactionTestCase
+from django.utils import timezone
+from rest_framework import status, test
+from rest_framework_simplejwt.tokens import AccessToken
+
+from wave2 import audit
+from wave2.models import Log, SmallInteger, Team, User
+
+
+class TestAuditMiddleware(test.APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='user', email='user@abv.bg',
+                                        is_superuser=True)
+        self.client.force_authenticate(self.user)
+        self.team = Team.objects.create(name='team', captain=self.user)
+        self.team.users.add(self.user)
+        for name, value in (('min_users_in_team', 3),
+                            ('max_users_in_team', 5), ('max_teams', 150)):
+            SmallInteger.objects.create(name=name, value=value)
+
+    def test_entry_is_written_after_the_view(self):
+        response = self.client.patch(f'/teams/{self.team.id}/',
+                                     {'name': 'renamed'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        log = Log.objects.get()
+        self.assertEqual((log.user, log.action),
+                         (self.user, {'name': 'renamed'}))
+
+    def test_failed_request_writes_nothing(self):
+        response = self.client.patch(f'/teams/{self.team.id}/',
+                                     {'name': 'x' * 101})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Log.objects.exists())
+
+
+class TestAsyncAuditMiddleware(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='user', email='user@abv.bg',
+                                        is_active=True)
+        self.team = Team.objects.create(name='team', captain=self.user)
+        self.team.users.add(self.user)
+        for name, value in (('min_users_in_team', 3),
+                            ('max_users_in_team', 5), ('max_teams', 150)):
+            SmallInteger.objects.create(name=name, value=value)
+
+    async def test_entry_of_a_sync_view_is_written(self):
+        # AsyncClient of Django 3.1 takes the headers as in the ASGI scope
+        body = b'{"name": "renamed"}'
+        response = await AsyncClient().patch(
+            f'/teams/{self.team.id}/', body,
+            content_type='application/json', headers=[
+                (b'host', b'testserver'),
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'authorization',
+                 f'Bearer {AccessToken.for_user(self.user)}'.encode()),
+            ],
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        log = await sync_to_async(Log.objects.get)()
+        self.assertEqual((log.user_id, log.action),
+                         (self.user.id, {'name': 'renamed'}))
+
+
+class TestRecord(TransactionTestCase):
+    def test_entries_are_inserted_on_commit(self):
+        user = User.objects.create(username='user', email='user@abv.bg')
+
+        with transaction.atomic():
+            audit.record(user, {'operation': 'first'})
+            audit.record(user, {'operation': 'second'})
+            self.assertFalse(Log.objects.exists())
+
+        self.assertEqual(Log.objects.filter(user=user).count(), 2)
+
+    def test_rolled_back_entries_are_dropped(self):
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                audit.record(None, {'operation': 'first'})
+                raise ValueError
+
+        audit.record(None, {'operation': 'second'})
+
+        self.assertEqual([log.action for log in Log.objects.all()],
+                         [{'operation': 'second'}])
+
+
+class TestLogView(test.APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create(username='staff',
+                                         email='staff@abv.bg', is_staff=True)
+        self.client.force_authenticate(self.staff)
+        now = timezone.now()
+        self.logs = []
+        for days in (3, 2, 1):
+            log = Log.objects.create(user=self.staff, action={'days': days})
+            Log.objects.filter(pk=log.pk).update(
+                date=now - timedelta(days=days)
+            )
+            self.logs.append(log)
+
+    def test_newest_first_in_the_time_range(self):
+        since = (timezone.now() - timedelta(days=2, hours=1)).isoformat()
+
+        response = self.client.get('/logs/', {'since': since})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([log['action'] for log in response.data['results']],
+                         [{'days': 1}, {'days': 2}])
+
+    def test_cursor_pages(self):
+        response = self.client.get('/logs/', {'page_size': 2})
+        response = self.client.get(response.data['next'])
+
+        self.assertEqual([log['id'] for log in response.data['results']],
+                         [self.logs[0].id])
+
+    def test_invalid_date_is_400(self):
+        response = self.client.get('/logs/', {'until': 'yesterday'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_staff_only(self):
+        self.client.force_authenticate(
+            User.objects.create(username='user', email='user@abv.bg')
+        )
+
+        response = self.client.get('/logs/')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,138 @@
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from rest_framework import status, test
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, UntypedToken
+
+from wave2 import authentication, models, versions
+from wave2.authentication import ClaimsAuthentication
+
+
+class TestClaimsAuthentication(TestCase):
+    def setUp(self):
+        self.user = models.User.objects.create_user(
+            username='user', email='user@abv.bg', password='hello',
+            first_name='First', last_name='Last', is_active=True,
+        )
+        self.token = AccessToken.for_user(self.user)
+        self.auth = ClaimsAuthentication()
+
+    def test_claims_are_loaded_with_the_stamp(self):
+        versions.stamps(models.User)
+
+        with self.assertNumQueries(2):
+            self.auth.get_user(self.token)
+
+    def test_cached_claims_need_only_the_stamp(self):
+        self.auth.get_user(self.token)
+
+        with self.assertNumQueries(1):
+            user = self.auth.get_user(self.token)
+            self.assertEqual(user, self.user)
+            self.assertFalse(user.is_captain)
+            self.assertFalse(user.has_team)
+
+    def test_request_reads_the_stamps_once(self):
+        client = test.APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        client.get('/teams/')
+
+        with self.assertNumQueries(2):  # the stamps and the response
+            response = client.get('/teams/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_other_fields_are_loaded_together(self):
+        user = self.auth.get_user(self.token)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'user@abv.bg')
+            self.assertEqual(user.first_name, 'First')
+
+    def test_claims_follow_membership_and_flags(self):
+        self.auth.get_user(self.token)
+        team = models.Team.objects.create(name='team')
+
+        team.users.add(self.user)
+        self.assertEqual(self.auth.get_user(self.token).current_team_id,
+                         team.id)
+
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(self.token)
+
+    def test_members_of_a_deleted_team_can_create_another(self):
+        for name, value in (('min_users_in_team', 3),
+                            ('max_users_in_team', 5), ('max_teams', 150)):
+            models.SmallInteger.objects.create(name=name, value=value)
+        models.FieldValidationDate.objects.create(
+            field='team_editable', date=date.today() + timedelta(days=1)
+        )
+        captain = models.User.objects.create(username='captain',
+                                             email='captain@abv.bg')
+        team = models.Team.objects.create(name='team', captain=captain)
+        team.users.add(captain, self.user)
+        self.assertTrue(self.auth.get_user(self.token).has_team)
+
+        client = test.APIClient()
+        client.force_authenticate(captain)
+        response = client.delete(f'/teams/{team.id}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        client = test.APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        response = client.post('/teams/', {
+            'name': 'another', 'technologies': [], 'users': [self.user.id],
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_obtained_token_carries_the_claims(self):
+        response = test.APIClient().post(
+            '/token/', {'email': 'user@abv.bg', 'password': 'hello'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        token = UntypedToken(response.data['access'])
+        self.assertEqual(token['user_id'], self.user.id)
+        self.assertIs(token['is_captain'], False)
+        self.assertIsNone(token['current_team_id'])
+
+        client = test.APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = client.get(f'/users/{self.user.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TestInvalidate(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = models.User.objects.create(username='user',
+                                               email='user@abv.bg')
+
+    def test_other_workers_drop_the_claims_on_commit(self):
+        stamp = versions.stamps(models.User)
+
+        with transaction.atomic():
+            authentication.invalidate(self.user.id)
+            self.assertEqual(versions.stamps(models.User), stamp)
+
+        self.assertNotEqual(versions.stamps(models.User), stamp)
+
+    def test_repair_teams_drops_the_claims(self):
+        team = models.Team.objects.create(name='team')
+        team.users.add(self.user)
+        models.Team.users.through.objects.all().delete()  # no signals
+        self.assertEqual(
+            authentication.claims(self.user.id)['current_team_id'], team.id
+        )
+
+        call_command('repair_teams')
+
+        self.assertIsNone(
+            authentication.claims(self.user.id)['current_team_id']
+        )
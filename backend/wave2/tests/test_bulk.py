@@ -0,0 +1,91 @@
+from django.utils import timezone
+from rest_framework import status, test
+
+from wave2 import bulk
+from wave2.models import Log, SmallInteger, Team, User
+
+
+class TestBulk(test.APITestCase):
+    def setUp(self):
+        SmallInteger.objects.create(name='max_teams', value=2)
+        self.confirmed = [
+            Team.objects.create(name=f'confirmed{i}', confirmed=True)
+            for i in range(2)
+        ]
+        self.waiting = Team.objects.create(name='waiting',
+                                           ready=timezone.now())
+        self.staff = User.objects.create(username='staff',
+                                         email='staff@abv.bg',
+                                         is_staff=True, is_superuser=True,
+                                         is_active=True)
+
+    def test_unconfirm_promotes_the_waitlist_once(self):
+        ids = [team.id for team in self.confirmed]
+
+        count = bulk.apply('unconfirm', ids, self.staff)
+
+        self.assertEqual(count, 2)
+        self.assertEqual(set(Team.objects.filter(confirmed=True)),
+                         {self.waiting})
+        self.assertEqual(Log.objects.filter(user=self.staff).count(), 2)
+
+    def test_confirm_follows_the_waitlist(self):
+        SmallInteger.objects.filter(name='max_teams').update(value=3)
+        late = Team.objects.create(name='late', ready=timezone.now())
+        forming = Team.objects.create(name='forming')
+
+        count = bulk.apply('confirm', [late.id, self.waiting.id, forming.id])
+
+        self.assertEqual(count, 1)
+        self.assertEqual(set(Team.objects.filter(confirmed=False)),
+                         {late, forming})
+
+    def test_query_count_does_not_depend_on_team_count(self):
+        teams = [Team.objects.create(name=f'team{i}') for i in range(10)]
+
+        # savepoint, select, update, insert the logs and release; the
+        # version stamp follows the commit
+        with self.assertNumQueries(5):
+            bulk.apply('lock', [team.id for team in teams[:2]])
+        with self.assertNumQueries(5):
+            bulk.apply('lock', [team.id for team in teams])
+
+        self.assertEqual(Team.objects.filter(is_full=True).count(), 10)
+
+    def test_endpoint_is_staff_only(self):
+        SmallInteger.objects.filter(name='max_teams').update(value=3)
+        self.client.force_authenticate(self.staff)
+        data = {'operation': 'confirm', 'teams': [str(self.waiting.id)]}
+
+        response = self.client.post('/teams/bulk/', data)
+        self.waiting.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.waiting.confirmed)
+        self.assertIsNone(self.waiting.ready)
+
+        self.client.force_authenticate(
+            User.objects.create(username='user', email='user@abv.bg')
+        )
+        response = self.client.post('/teams/bulk/', data)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_endpoint_rejects_unknown_operations(self):
+        self.client.force_authenticate(self.staff)
+
+        response = self.client.post('/teams/bulk/', {
+            'operation': 'delete', 'teams': [str(self.waiting.id)]
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_action(self):
+        self.client.force_login(self.staff)
+
+        response = self.client.post('/admin/wave2/team/', {
+            'action': 'unlock', 'index': 0,
+            '_selected_action': [str(team.id) for team in self.confirmed],
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Log.objects.count(), 2)
@@ -0,0 +1,292 @@
+import gzip
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from wave2 import authentication, models
+
+
+class TestRepairTeams(TestCase):
+    def setUp(self):
+        self.users = [
+            models.User.objects.create(username=f'user#{i}',
+                                       email=f'user{i}@abv.bg')
+            for i in range(4)
+        ]
+
+    def call(self):
+        call_command('repair_teams', stdout=StringIO())
+
+    def test_empty_team_is_deleted(self):
+        models.Team.objects.create(name='empty')
+
+        self.call()
+
+        self.assertFalse(models.Team.objects.exists(), 'team should be gone')
+
+    def test_team_without_captain_gets_flagged_member(self):
+        team = models.Team.objects.create(name='team')
+        team.users.set(self.users[:2])
+        self.users[1].is_captain = True
+        self.users[1].save()
+
+        self.call()
+        team.refresh_from_db()
+
+        self.assertEqual(team.captain, self.users[1])
+
+    def test_captain_outside_team_is_replaced_and_flags_are_synced(self):
+        team = models.Team.objects.create(name='team',
+                                          captain=self.users[3])
+        team.users.set(self.users[:2])
+        self.users[3].is_captain = True
+        self.users[3].save()
+
+        self.call()
+        team.refresh_from_db()
+
+        self.assertEqual(team.captain, self.users[0])
+        self.assertEqual(
+            list(models.User.objects.filter(is_captain=True)),
+            [self.users[0]]
+        )
+
+    def test_counters_are_rebuilt(self):
+        team = models.Team.objects.create(name='team')
+        team.users.set(self.users[:2])
+        models.Team.objects.update(member_count=0)
+        models.User.objects.update(current_team=None)
+
+        self.call()
+        team.refresh_from_db()
+
+        self.assertEqual(team.member_count, 2)
+        self.assertEqual(
+            set(models.User.objects.filter(current_team=team)),
+            set(self.users[:2])
+        )
+
+
+class TestMailParticipants(TestCase):
+    def setUp(self):
+        self.users = [
+            models.User.objects.create(username=f'user#{i}',
+                                       email=f'user{i}@abv.bg',
+                                       first_name=f'First{i}',
+                                       is_active=True)
+            for i in range(5)
+        ]
+        team = models.Team.objects.create(name='team', confirmed=True,
+                                          captain=self.users[0])
+        team.users.set(self.users[:3])
+
+    def call(self, *args):
+        call_command('mail_participants', 'news', 'forgot_password_mail.html',
+                     '--text-template', 'forgot_password_mail.txt',
+                     '--chunk-size', '2', *args, stdout=StringIO())
+
+    def test_mails_only_selected_recipients(self):
+        self.call('--to', 'in_team')
+
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            [user.email for user in self.users[:3]]
+        )
+
+    def test_templates_are_personalized(self):
+        self.call('--to', 'confirmed_captains')
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('First0', mail.outbox[0].body)
+        self.assertIn('First0', mail.outbox[0].alternatives[0][0])
+
+    def test_rerun_continues_after_progress(self):
+        with tempfile.TemporaryDirectory() as directory:
+            progress = Path(directory) / 'news.progress'
+            progress.write_text(str(self.users[2].id))
+
+            self.call('--progress', str(progress))
+
+            self.assertEqual(progress.read_text(), str(self.users[4].id))
+        self.assertEqual(
+            [message.to[0] for message in mail.outbox],
+            [user.email for user in self.users[3:]]
+        )
+
+
+def team_row(name, users, technologies='Python',
+             description='description'):
+    return '\t'.join([name, users, 'https://github.com/team', 'project',
+                      description, technologies])
+
+
+class TestImportTeams(TestCase):
+    def setUp(self):
+        self.python = models.Technology.objects.create(name='Python')
+        self.users = [
+            models.User.objects.create(
+                username=f'user#{i}', email=f'user{i}@abv.bg',
+                first_name='Ivan', last_name=f'Ivanov{i}', form='10В'
+            )
+            for i in range(4)
+        ]
+        models.SmallInteger.objects.create(name='min_users_in_team', value=2)
+        models.SmallInteger.objects.create(name='max_teams', value=2)
+
+    def call(self, *rows, dry_run=False):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as f:
+            f.write('\n'.join(rows))
+            f.flush()
+            out, err = StringIO(), StringIO()
+            call_command('import_teams', f.name, dry_run=dry_run,
+                         stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_creates_teams_with_members(self):
+        self.call(
+            team_row('first', 'Ivan Ivanov0 - 10В, ivan  ivanov1 - 10В',
+                     description='one\ntwo'),
+            '',
+            team_row('second', 'Ivan Ivanov2 - 10В'),
+        )
+
+        team = models.Team.objects.get(name='first')
+        self.assertEqual(team.project_description, 'one\ntwo')
+        self.assertEqual(set(team.users.all()), set(self.users[:2]))
+        self.assertEqual(list(team.technologies.all()), [self.python])
+        self.assertEqual(team.member_count, 2)
+        self.assertEqual(team.captain, self.users[0])
+        self.users[0].refresh_from_db()
+        self.assertTrue(self.users[0].is_captain)
+        self.assertEqual(self.users[0].current_team, team)
+        self.assertEqual(models.Team.objects.get(name='second').captain,
+                         self.users[2])
+
+    def test_rerun_updates_and_moves_members(self):
+        self.call(team_row('first', 'Ivan Ivanov0 - 10В, Ivan Ivanov1 - 10В'),
+                  team_row('second', 'Ivan Ivanov2 - 10В'))
+
+        out, _ = self.call(team_row('second',
+                                    'Ivan Ivanov2 - 10В, Ivan Ivanov0 - 10В',
+                                    description='new'))
+
+        first = models.Team.objects.get(name='first')
+        second = models.Team.objects.get(name='second')
+        self.assertIn('~ second: project_description', out)
+        self.assertEqual(first.captain, self.users[1])
+        self.assertEqual(first.member_count, 1)
+        self.assertEqual(second.captain, self.users[2])
+        self.assertEqual(second.member_count, 2)
+        self.users[0].refresh_from_db()
+        self.assertFalse(self.users[0].is_captain)
+        self.assertEqual(self.users[0].current_team, second)
+
+    def test_team_left_with_too_few_members_gives_its_place_away(self):
+        self.call(team_row('first', 'Ivan Ivanov0 - 10В, Ivan Ivanov1 - 10В'))
+        models.Team.objects.update(confirmed=True)
+        waiting = models.Team.objects.create(name='waiting',
+                                             ready=timezone.now())
+        models.Team.objects.create(name='other', confirmed=True)
+
+        self.call(team_row('second', 'Ivan Ivanov0 - 10В'))
+
+        first = models.Team.objects.get(name='first')
+        waiting.refresh_from_db()
+        self.assertFalse(first.confirmed)
+        self.assertTrue(waiting.confirmed)
+
+    def test_team_left_without_members_is_deleted(self):
+        self.call(team_row('first', 'Ivan Ivanov0 - 10В'))
+        claims = authentication.claims(self.users[0].id)
+
+        self.call(team_row('second', 'Ivan Ivanov0 - 10В, Ivan Ivanov1 - 10В'))
+
+        second = models.Team.objects.get()
+        self.assertEqual(second.name, 'second')
+        self.assertEqual(second.captain, self.users[0])
+        self.assertEqual(
+            authentication.claims(self.users[0].id)['current_team_id'],
+            second.id,
+        )
+        self.assertNotEqual(claims['current_team_id'], second.id)
+
+    def test_reports_unknown_and_ambiguous_names(self):
+        models.User.objects.create(username='twin', email='twin@abv.bg',
+                                   first_name='Ivan', last_name='Ivanov3',
+                                   form='10В')
+
+        _, err = self.call(team_row('team', 'Ivan Ivanov3 - 10В, Nobody - 10В',
+                                    technologies='Python, Cobol'),
+                           'broken\trow')
+
+        self.assertIn('no single user Ivan Ivanov3', err)
+        self.assertIn('no single user Nobody', err)
+        self.assertIn('unknown technology Cobol', err)
+        self.assertIn('rejected', err)
+        self.assertFalse(models.Team.objects.get(name='team').users.exists())
+
+    def test_dry_run_changes_nothing(self):
+        out, _ = self.call(team_row('team', 'Ivan Ivanov0 - 10В'),
+                           dry_run=True)
+
+        self.assertIn('+ team', out)
+        self.assertFalse(models.Team.objects.exists())
+
+
+class TestArchiveLogs(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.user = models.User.objects.create(username='user',
+                                               email='user@abv.bg')
+
+    def create_log(self, date, **action):
+        log = models.Log.objects.create(user=self.user, action=action)
+        models.Log.objects.filter(pk=log.pk).update(date=date)
+        return log
+
+    def call(self):
+        call_command('archive_logs', days=90,
+                     directory=Path(self.directory.name), chunk_size=2,
+                     stdout=StringIO())
+
+    def read(self, name):
+        with gzip.open(Path(self.directory.name) / name, 'rt') as archive:
+            return [json.loads(line) for line in archive]
+
+    def test_moves_old_entries_to_monthly_files(self):
+        now = timezone.now()
+        january = now.replace(year=now.year - 1, month=1, day=10)
+        for i in range(3):
+            self.create_log(january, name=f'team{i}')
+        self.create_log(january.replace(month=2), name='february')
+        recent = self.create_log(now, name='recent')
+
+        self.call()
+
+        self.assertEqual(list(models.Log.objects.all()), [recent])
+        lines = self.read(f'log-{january.year}-01.ndjson.gz')
+        self.assertEqual([line['action'] for line in lines],
+                         [{'name': f'team{i}'} for i in range(3)])
+        self.assertEqual(lines[0]['user'], self.user.id)
+        self.assertEqual(len(self.read(f'log-{january.year}-02.ndjson.gz')),
+                         1)
+
+    def test_later_runs_append_to_the_month(self):
+        january = timezone.now().replace(year=timezone.now().year - 1,
+                                         month=1, day=10)
+        self.create_log(january, name='first')
+        self.call()
+        self.create_log(january, name='second')
+        self.call()
+
+        lines = self.read(f'log-{january.year}-01.ndjson.gz')
+
+        self.assertEqual([line['action']['name'] for line in lines],
+                         ['first', 'second'])
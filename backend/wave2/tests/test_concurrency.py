@@ -0,0 +1,104 @@
+import threading
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from django.utils import timezone
+from rest_framework import status, test
+
+from wave2.models import FieldValidationDate, SmallInteger, Team
+
+from .factories import create_users
+
+
+def set_up_limits(max_users=3):
+    FieldValidationDate.objects.create(
+        field='team_editable', date=date.today() + timedelta(days=1)
+    )
+    SmallInteger.objects.create(name='min_users_in_team', value=2)
+    SmallInteger.objects.create(name='max_users_in_team', value=max_users)
+    SmallInteger.objects.create(name='max_teams', value=1)
+
+
+class TestTeamMembership(test.APITestCase):
+    def setUp(self):
+        set_up_limits()
+        self.users = create_users(4)
+        self.client.force_authenticate(self.users[0])
+
+    def test_post_400_with_user_from_other_team(self):
+        team = Team.objects.create(name='team')
+        team.users.set([self.users[1]])
+
+        response = self.client.post('/teams/', {
+            'name': 'second', 'technologies': [],
+            'users': [self.users[0].id, self.users[1].id],
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Team.objects.count(), 1)
+
+    def test_post_leave_team_under_minimum_promotes_waiting_team(self):
+        team = Team.objects.create(name='team', confirmed=True,
+                                   captain=self.users[1])
+        team.users.set(self.users[:2])
+        waiting = Team.objects.create(name='waiting', ready=timezone.now())
+        waiting.users.set(self.users[2:])
+
+        response = self.client.post(f'/users/{self.users[0].id}/leave_team/')
+        team.refresh_from_db()
+        waiting.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(team.confirmed, 'team should not be confirmed')
+        self.assertTrue(waiting.confirmed, 'team should get confirmed')
+
+    def test_post_leave_team_400_without_team(self):
+        response = self.client.post(f'/users/{self.users[0].id}/leave_team/')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class TestConcurrentTeamCreation(TransactionTestCase):
+    """
+    Fires parallel team creations that compete for the same users
+    against the real database.
+    """
+    threads = 8
+
+    def setUp(self):
+        set_up_limits(max_users=3)
+        self.users = create_users(self.threads * 2)
+
+    def create_team(self, i, responses):
+        client = test.APIClient()
+        client.force_authenticate(self.users[i])
+        # every request also asks for the next two creators
+        users = [self.users[(i + j) % self.threads].id for j in range(3)]
+        try:
+            responses[i] = client.post('/teams/', {
+                'name': f'team{i}', 'technologies': [], 'users': users,
+            }).status_code
+        finally:
+            connection.close()
+
+    def test_parallel_creations_never_share_users(self):
+        responses = [None] * self.threads
+        threads = [
+            threading.Thread(target=self.create_team, args=(i, responses))
+            for i in range(self.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertIn(status.HTTP_201_CREATED, responses)
+        memberships = Team.users.through.objects.values_list('user',
+                                                             flat=True)
+        self.assertEqual(len(memberships), len(set(memberships)))
+        for team in Team.objects.all():
+            self.assertEqual(team.member_count, team.users.count())
+            self.assertLessEqual(team.member_count, 3)
+        self.assertLessEqual(Team.objects.filter(confirmed=True).count(), 1)
@@ -0,0 +1,49 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from wave2.config import VERSION_KEY, config
+from wave2.models import FieldValidationDate, SmallInteger
+
+
+class TestConfig(TestCase):
+    def setUp(self):
+        self.max_teams = SmallInteger.objects.create(name='max_teams',
+                                                     value=50)
+        FieldValidationDate.objects.create(field='team_editable',
+                                           date=date(2021, 3, 1))
+        config.expire()
+
+    def test_rows_are_loaded_once(self):
+        self.assertEqual(config.max_teams, 50)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(config.max_teams, 50)
+            self.assertEqual(config.team_editable, date(2021, 3, 1))
+            self.assertEqual(config.dates, {'team_editable': date(2021, 3, 1)})
+
+    def test_save_invalidates(self):
+        config.max_teams
+
+        self.max_teams.value = 60
+        self.max_teams.save()
+
+        self.assertEqual(config.max_teams, 60)
+
+    def test_delete_invalidates(self):
+        config.max_teams
+
+        self.max_teams.delete()
+
+        with self.assertRaises(SmallInteger.DoesNotExist):
+            config.max_teams
+
+    def test_version_bump_from_other_worker_reloads_on_next_request(self):
+        config.max_teams
+        SmallInteger.objects.filter(name='max_teams').update(value=70)
+        cache.set(VERSION_KEY, 'other worker')
+
+        self.assertEqual(config.max_teams, 50)  # same request
+        config.expire()  # next request
+        self.assertEqual(config.max_teams, 70)
@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+
+from rest_framework import status, test
+
+from wave2 import models
+from wave2.export import chunked
+
+from .factories import create_teams
+
+
+class TestExport(test.APITestCase):
+    def setUp(self):
+        self.technology = models.Technology.objects.create(name='Python')
+        self.staff = models.User.objects.create(
+            username='staff', email='staff@abv.bg', is_staff=True,
+            is_active=True, first_name='Staff', last_name='Member',
+        )
+        self.client = test.APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def create_teams(self, count):
+        create_teams(count, members=2, technologies=[self.technology],
+                     first_name='Иван', last_name='Иванов', form='10В',
+                     tshirt_size='l', alergies='орехи')
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_non_staff_is_forbidden(self):
+        self.client.force_authenticate(
+            models.User.objects.create(username='user', email='u@abv.bg')
+        )
+
+        response = self.client.get('/users/export/')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_users_csv(self):
+        self.create_teams(1)
+
+        content = self.get('/users/export/')
+        self.assertTrue(content.startswith('\ufeffid,'))
+        rows = list(csv.DictReader(io.StringIO(content[1:])))
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1]['last_name'], 'Иванов0')
+        self.assertEqual(rows[1]['alergies'], 'орехи')
+        self.assertEqual(rows[1]['team'], 'team0')
+        self.assertEqual(rows[0]['team'], '')
+
+    def test_teams_ndjson(self):
+        self.create_teams(2)
+
+        content = self.get('/teams/export/?output=ndjson')
+        teams = [json.loads(line) for line in content.splitlines()]
+
+        self.assertEqual({team['name'] for team in teams}, {'team0', 'team1'})
+        self.assertEqual(teams[0]['member_count'], 2)
+        self.assertEqual(teams[0]['technologies'], 'Python')
+        self.assertIn('Иванов1 - 10В', teams[0]['users'])
+
+    def test_unknown_output_is_rejected(self):
+        response = self.client.get('/teams/export/?output=xml')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_count_grows_with_chunks_not_rows(self):
+        self.create_teams(5)
+        queryset = models.Team.objects.prefetch_related('users')
+
+        with self.assertNumQueries(6):  # 3 chunks with a prefetch each
+            teams = [(team, list(team.users.all()))
+                     for team in chunked(queryset, chunk_size=2)]
+
+        self.assertEqual(len(teams), 5)
+        self.assertEqual(len({team.pk for team, _ in teams}), 5)
@@ -0,0 +1,98 @@
+from io import StringIO
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from wave2.models import Email, User
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError('provider is down')
+
+
+class UnreachableBackend(BaseEmailBackend):
+    def open(self):
+        raise ConnectionError('connection refused')
+
+
+@override_settings(
+    EMAIL_BACKEND='wave2.mail.OutboxBackend',
+    OUTBOX_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    OUTBOX_RATE_PER_MINUTE=100,
+    OUTBOX_MAX_ATTEMPTS=3,
+)
+class TestOutbox(TestCase):
+    def send(self, count):
+        for i in range(count):
+            message = mail.EmailMultiAlternatives(
+                f'subject {i}', 'text', 'no-reply@hacktues.com',
+                [f'user{i}@abv.bg']
+            )
+            message.attach_alternative('<p>html</p>', 'text/html')
+            message.send()
+
+    def work(self):
+        call_command('send_emails', '--once', stdout=StringIO())
+
+    def test_send_only_enqueues(self):
+        self.send(2)
+
+        self.assertEqual(Email.objects.filter(sent=None).count(), 2)
+        self.assertEqual(mail.outbox, [])
+
+    def test_worker_sends_pending_mail(self):
+        self.send(3)
+
+        self.work()
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives,
+                         [('<p>html</p>', 'text/html')])
+        self.assertFalse(Email.objects.filter(sent=None).exists())
+
+    @override_settings(OUTBOX_RATE_PER_MINUTE=2)
+    def test_worker_respects_rate_limit(self):
+        self.send(3)
+
+        self.work()
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(Email.objects.filter(sent=None).count(), 1)
+
+    @override_settings(OUTBOX_EMAIL_BACKEND=__name__ + '.FailingBackend')
+    def test_failed_mail_is_retried_later(self):
+        self.send(1)
+
+        self.work()
+        email = Email.objects.get()
+
+        self.assertIsNone(email.sent)
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.error, 'provider is down')
+        self.assertGreater(email.send_after, timezone.now())
+
+    @override_settings(OUTBOX_EMAIL_BACKEND=__name__ + '.UnreachableBackend')
+    def test_connection_failure_fails_the_batch(self):
+        self.send(2)
+
+        self.work()
+
+        for email in Email.objects.all():
+            self.assertIsNone(email.sent)
+            self.assertEqual(email.attempts, 1)
+            self.assertEqual(email.error, 'connection refused')
+            self.assertGreater(email.send_after, timezone.now())
+
+    def test_forgotten_password_is_queued(self):
+        User.objects.create_user(email='user@abv.bg', password='pass',
+                                 username='user')
+
+        response = self.client.post('/users/forgotten_password/',
+                                    {'email': 'user@abv.bg'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Email.objects.get().to, ['user@abv.bg'])
@@ -58,6 +58,50 @@ class TestTeamModel(APITestCase):
         t.full_clean()
 
 
+class TestMembershipCounters(APITestCase):
+    def setUp(self):
+        self.team = Team.objects.create(name='team')
+        self.users = [
+            User.objects.create(username=str(i), email=f'{i}@abv.bg')
+            for i in range(3)
+        ]
+
+    def test_add_updates_team_and_users(self):
+        self.team.users.add(*self.users)
+
+        self.assertEqual(self.team.member_count, 3)
+        self.assertTrue(all(
+            user.has_team for user in User.objects.filter(id__in=[
+                user.id for user in self.users
+            ])
+        ), 'users should have team')
+
+    def test_set_removes_old_members(self):
+        self.team.users.set(self.users)
+
+        self.team.users.set(self.users[:1])
+        self.users[1].refresh_from_db()
+
+        self.assertEqual(self.team.member_count, 1)
+        self.assertFalse(self.users[1].has_team, 'user should not have team')
+
+    def test_reverse_clear_updates_team_and_user(self):
+        self.team.users.set(self.users)
+
+        self.users[0].team_set.clear()
+        self.team.refresh_from_db()
+
+        self.assertEqual(self.team.member_count, 2)
+        self.assertFalse(self.users[0].has_team, 'user should not have team')
+
+    def test_has_team_does_not_query(self):
+        self.team.users.add(self.users[0])
+        user = User.objects.get(id=self.users[0].id)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_team, 'user should have team')
+
+
 class TestUserModelUsernameValidator(APITestCase):
     def setUp(self):
         self.data = {
@@ -1,6 +1,10 @@
+from datetime import date, timedelta
+
 from rest_framework import status, test
+from rest_framework.request import Request
 
 from wave2 import models
+from wave2.permissions import TeamPermissions, context
 
 
 class TestUserPermission(test.APITestCase):
@@ -109,3 +113,58 @@ class TestTeamPermission(test.APITestCase):
         response = self.client.patch(f'/teams/{team.id}/', data)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TestAuthorizationContext(test.APITestCase):
+    def setUp(self):
+        self.user = models.User.objects.create(username='captain',
+                                               email='captain@abv.bg',
+                                               is_captain=True)
+        self.team = models.Team.objects.create(name='team',
+                                               captain=self.user)
+        self.team.users.add(self.user)
+        self.user.refresh_from_db()
+        models.FieldValidationDate.objects.create(
+            field='team_editable', date=date.today() + timedelta(days=1)
+        )
+        self.request = Request(test.APIRequestFactory().patch('/'))
+        self.request.user = self.user
+
+    def test_context_is_made_once_per_request(self):
+        self.assertIs(context(self.request), context(self.request))
+
+    def test_captain_checks_need_no_queries_after_the_first(self):
+        view = type('View', (), {'action': 'change_captain'})()
+        permission = TeamPermissions()
+        self.assertTrue(
+            permission.has_object_permission(self.request, view, self.team)
+        )
+
+        with self.assertNumQueries(0):
+            self.assertTrue(permission.has_object_permission(
+                self.request, view, self.team
+            ))
+            self.assertTrue(context(self.request).has_team)
+
+    def test_flagged_member_without_captain_column(self):
+        self.team.captain = None
+
+        self.assertTrue(context(self.request).is_captain_of(self.team))
+        with self.assertNumQueries(0):
+            context(self.request).is_captain_of(self.team)
+
+    def test_captain_column_without_membership(self):
+        self.team.users.remove(self.user)
+        self.user.refresh_from_db()
+        request = Request(test.APIRequestFactory().patch('/'))
+        request.user = self.user
+
+        self.assertFalse(context(request).is_captain_of(self.team))
+
+    def test_flagged_member_of_a_team_with_another_captain(self):
+        other = models.User.objects.create(username='other',
+                                           email='other@abv.bg')
+        self.team.users.add(other)
+        self.team.captain = other
+
+        self.assertFalse(context(self.request).is_captain_of(self.team))
@@ -1,6 +1,26 @@
+from datetime import date, timedelta
+
+from unittest import skipUnless
+
+from django.conf import settings
+from django.db import connection
+from django.test import override_settings
 from rest_framework import status, test
+from rest_framework.request import Request
+
+from wave2 import models, versions, views
+from wave2.filters import LookupFilter
+from wave2.pagination import CursorPagination
+
+from .factories import create_teams
 
-from wave2 import models
+# keeps the cached responses out of the counted queries
+locmem_responses = override_settings(
+    CACHES={**settings.CACHES, 'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }},
+    CACHE_MIDDLEWARE_ALIAS='responses',
+)
 
 
 class TestTeamView(test.APITestCase):
@@ -51,3 +71,386 @@ class TestTeamView(test.APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(models.Log.objects.first().action, data)
+
+
+@locmem_responses
+class TestTeamListQueries(test.APITestCase):
+    def setUp(self):
+        self.client = test.APIClient()
+        self.technology = models.Technology.objects.create(name='Python')
+        # the stamps are written on commit, which a TestCase never reaches
+        versions.stamps(models.Team, models.User, models.Technology)
+
+    def create_teams(self, count):
+        create_teams(count, technologies=[self.technology])
+
+    def test_get_list_query_count_does_not_depend_on_team_count(self):
+        self.create_teams(2)
+        # the version stamps, then the teams, users and technologies
+        with self.assertNumQueries(1 + 3):
+            response = self.client.get('/teams/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.create_teams(10)
+        with self.assertNumQueries(1 + 3):
+            # another query, the stamps have not moved without a commit
+            response = self.client.get('/teams/?page_size=20')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 12)
+
+    def test_get_list_pages_follow_creation_order(self):
+        self.create_teams(5)
+
+        names = []
+        url = '/teams/?page_size=2'
+        while url:
+            with self.assertNumQueries(1 + 3):
+                response = self.client.get(url)
+            names += [team['name'] for team in response.data['results']]
+            url = response.data['next']
+
+        self.assertEqual(names, [f'team{i}' for i in range(5)])
+
+    def test_get_list_fields_skip_prefetches(self):
+        self.create_teams(2)
+
+        with self.assertNumQueries(1 + 1):
+            response = self.client.get('/teams/?fields=id,name,is_full')
+
+        self.assertEqual(set(response.data['results'][0]),
+                         {'id', 'name', 'is_full'})
+
+    def test_get_list_not_expanded_users_are_ids(self):
+        self.create_teams(1)
+        ids = set(models.User.objects.values_list('id', flat=True))
+
+        with self.assertNumQueries(1 + 2):
+            response = self.client.get('/teams/?fields=users&expand=')
+
+        self.assertEqual(set(response.data['results'][0]['users']), ids)
+
+    def test_get_user_list_prefetches_requested_relations(self):
+        self.create_teams(2)
+
+        with self.assertNumQueries(3):
+            response = self.client.get('/users/?page_size=500')
+        with self.assertNumQueries(1):
+            self.client.get('/users/?fields=id,first_name')
+
+        self.assertEqual(len(response.data['results']), 6)
+
+    def test_get_list_page_size_is_capped(self):
+        request = Request(test.APIRequestFactory().get(
+            '/teams/', {'page_size': 100000}
+        ))
+
+        self.assertEqual(CursorPagination().get_page_size(request),
+                         CursorPagination.max_page_size)
+
+    def test_get_detail_returns_captain_without_extra_queries(self):
+        self.create_teams(1)
+        team = models.Team.objects.get()
+        captain = team.captain
+
+        with self.assertNumQueries(1 + 3):
+            response = self.client.get(f'/teams/{team.id}/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['captain'], captain.id)
+        self.assertEqual(response.data['technologies'], ['Python'])
+
+
+@locmem_responses
+class TestConditionalGet(test.APITestCase):
+    def setUp(self):
+        self.client = test.APIClient()
+        self.technology = models.Technology.objects.create(name='Python')
+        self.team = models.Team.objects.create(name='team')
+
+    def test_matching_etag_is_answered_without_queries(self):
+        response = self.client.get('/teams/')
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):  # the version stamps
+            response = self.client.get('/teams/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertIn('Last-Modified', response)
+
+    def test_unrelated_tables_keep_the_etag(self):
+        etag = self.client.get('/technologies/')['ETag']
+
+        self.team.name = 'renamed'
+        self.team.save()
+        response = self.client.get('/technologies/',
+                                   HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+@locmem_responses
+class TestResponseCache(test.APITestCase):
+    def setUp(self):
+        self.client = test.APIClient()
+        self.team = models.Team.objects.create(name='team')
+        self.user = models.User.objects.create(username='user',
+                                               email='user@abv.bg')
+
+    def test_repeated_get_is_served_from_the_cache(self):
+        first = self.client.get('/teams/')
+
+        with self.assertNumQueries(1):  # the version stamps
+            second = self.client.get('/teams/')
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_key_varies_by_query_and_auth(self):
+        self.client.get('/teams/')
+
+        with self.assertNumQueries(1 + 3):
+            self.client.get('/teams/?page_size=1')
+        self.client.force_authenticate(self.user)
+        with self.assertNumQueries(1 + 3):
+            self.client.get('/teams/')
+
+
+# the stamps are bumped on commit
+@locmem_responses
+class TestChangedTables(test.APITransactionTestCase):
+    def setUp(self):
+        self.client = test.APIClient()
+        self.technology = models.Technology.objects.create(name='Python')
+        self.team = models.Team.objects.create(name='team')
+        self.user = models.User.objects.create(username='user',
+                                               email='user@abv.bg')
+
+    def test_etag_changes_with_the_tables_and_the_query(self):
+        etag = self.client.get('/teams/')['ETag']
+        detail = self.client.get(f'/teams/{self.team.id}/')['ETag']
+
+        self.assertNotEqual(self.client.get('/teams/?fields=id')['ETag'],
+                            etag)
+        self.assertNotEqual(detail, etag)
+
+        self.team.technologies.add(self.technology)
+        response = self.client.get('/teams/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_membership_change_is_never_stale(self):
+        self.client.get('/teams/')
+
+        self.team.users.add(self.user)
+        response = self.client.get('/teams/')
+
+        self.assertEqual(
+            [user['id'] for user in response.json()['results'][0]['users']],
+            [self.user.id],
+        )
+
+
+class TestSearch(test.APITestCase):
+    def setUp(self):
+        self.client = test.APIClient()
+        self.users = [
+            models.User.objects.create(
+                username=f'user#{i}', email=f'{name.lower()}@abv.bg',
+                first_name=name, last_name=last_name, form=form,
+                discord_id=i,
+            )
+            for i, (name, last_name, form) in enumerate([
+                ('Ivan', 'Petrov', '10В'), ('Ivana', 'Ivanova', '11А'),
+                ('Petar', 'Ivanov', '10В'),
+            ])
+        ]
+        self.team = models.Team.objects.create(name='Rocket',
+                                               project_name='Lander')
+        self.team.users.add(self.users[2])
+
+    def ids(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['id'] for item in response.data['results']]
+
+    def plan(self, view, **query):
+        request = Request(test.APIRequestFactory().get('/', query))
+        return LookupFilter().filter_queryset(
+            request, view.queryset, view
+        ).explain()
+
+    def index(self, model, field):
+        return next(index.name for index in model._meta.indexes
+                    if index.fields == [field])
+
+    def test_q_matches_every_word_as_a_prefix(self):
+        self.assertEqual(self.ids('/users/?q=iva'),
+                         [user.id for user in self.users])
+        self.assertEqual(self.ids('/users/?q=ivan+pet'),
+                         [self.users[0].id, self.users[2].id])
+        self.assertEqual(self.ids('/users/?q=van'), [])
+
+    def test_exact_filters(self):
+        self.assertEqual(self.ids('/users/?form=10В&q=ivan'),
+                         [self.users[0].id, self.users[2].id])
+        self.assertEqual(self.ids('/users/?discord_id=1'),
+                         [self.users[1].id])
+        self.assertEqual(self.ids('/teams/?discord_id=2'),
+                         [str(self.team.id)])
+
+    def test_invalid_filter_value_is_rejected(self):
+        response = self.client.get('/users/?discord_id=bot')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_teams_are_searched_by_name_and_project(self):
+        self.assertEqual(self.ids('/teams/?q=land'), [str(self.team.id)])
+        self.assertEqual(self.ids('/teams/?q=rock'), [str(self.team.id)])
+        self.assertEqual(self.ids('/teams/?q=ivan'), [])
+
+    def test_form_filter_uses_its_index(self):
+        self.assertIn(self.index(models.User, 'form'),
+                      self.plan(views.UserViewSet, form='10В'))
+
+    @skipUnless(connection.vendor == 'mysql',
+                'sqlite does not use indexes for LIKE ... ESCAPE')
+    def test_prefix_search_uses_the_name_indexes(self):
+        plan = self.plan(views.UserViewSet, q='ivan')
+
+        self.assertIn(self.index(models.User, 'first_name'), plan)
+        self.assertIn(self.index(models.User, 'last_name'), plan)
+
+
+class TestTeamCaptain(test.APITestCase):
+    def setUp(self):
+        self.client = test.APIClient()
+        models.FieldValidationDate.objects.create(
+            field='team_editable', date=date.today() + timedelta(days=1)
+        )
+        models.SmallInteger.objects.create(name='min_users_in_team', value=3)
+        self.users = [
+            models.User.objects.create(username=f'user#{i}',
+                                       email=f'user{i}@abv.bg')
+            for i in range(3)
+        ]
+        self.team = models.Team.objects.create(name='team')
+        self.team.users.set(self.users)
+        self.team.captain = self.users[0]
+        self.team.save()
+        self.users[0].is_captain = True
+        self.users[0].save()
+
+    def test_post_change_captain_updates_captain_column(self):
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.post(
+            f'/teams/{self.team.id}/change_captain/',
+            {'users': self.users[1].id}
+        )
+        self.team.refresh_from_db()
+        self.users[1].refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.team.captain, self.users[1])
+        self.assertTrue(self.users[1].is_captain, 'user should be captain')
+
+    def test_post_adds_the_creator_to_the_team(self):
+        models.SmallInteger.objects.create(name='max_users_in_team', value=5)
+        models.SmallInteger.objects.create(name='max_teams', value=150)
+        creator = models.User.objects.create(username='creator',
+                                             email='creator@abv.bg')
+        other = models.User.objects.create(username='other',
+                                           email='other@abv.bg')
+        self.client.force_authenticate(creator)
+
+        response = self.client.post('/teams/', {
+            'name': 'new', 'technologies': [], 'users': [other.id],
+        })
+        creator.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        team = models.Team.objects.get(name='new')
+        self.assertEqual(team.captain, creator)
+        self.assertEqual(set(team.users.all()), {creator, other})
+        self.assertTrue(creator.has_team)
+
+    def test_post_change_captain_to_non_member_is_400(self):
+        outsider = models.User.objects.create(username='outsider',
+                                              email='outsider@abv.bg')
+        self.client.force_authenticate(self.users[0])
+
+        for users in (outsider.id, 'abc', None):
+            data = {} if users is None else {'users': users}
+            response = self.client.post(
+                f'/teams/{self.team.id}/change_captain/', data
+            )
+            self.assertEqual(response.status_code,
+                             status.HTTP_400_BAD_REQUEST)
+
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.captain, self.users[0])
+
+    def test_patch_without_captain_hands_over_captaincy(self):
+        models.SmallInteger.objects.create(name='max_users_in_team', value=5)
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.patch(f'/teams/{self.team.id}/', {
+            'users': [user.id for user in self.users[1:]]
+        })
+        self.team.refresh_from_db()
+        self.users[0].refresh_from_db()
+        self.users[1].refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.team.captain, self.users[1])
+        self.assertTrue(self.users[1].is_captain, 'user should be captain')
+        self.assertFalse(self.users[0].is_captain, 'user left the team')
+
+    def test_post_leave_team_captain_hands_over_captaincy(self):
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.post(f'/users/{self.users[0].id}/leave_team/')
+        self.team.refresh_from_db()
+        self.users[0].refresh_from_db()
+        self.users[1].refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.team.captain, self.users[1])
+        self.assertTrue(self.users[1].is_captain, 'user should be captain')
+        self.assertFalse(self.users[0].is_captain, 'user left the team')
+
+    def test_post_leave_team_last_member_deletes_team(self):
+        self.team.users.set([self.users[0]])
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.post(f'/users/{self.users[0].id}/leave_team/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(models.Team.objects.exists(), 'team should be gone')
+
+    def test_post_leave_team_under_minimum_unconfirms_team(self):
+        models.SmallInteger.objects.create(name='max_teams', value=150)
+        self.team.confirmed = True
+        self.team.save()
+        self.client.force_authenticate(self.users[2])
+
+        response = self.client.post(f'/users/{self.users[2].id}/leave_team/')
+        self.team.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.team.member_count, 2)
+        self.assertFalse(self.team.confirmed, 'team should not be confirmed')
+
+    def test_get_does_not_repair_captain(self):
+        self.team.captain = None
+        self.team.save()
+
+        response = self.client.get(f'/teams/{self.team.id}/')
+        self.team.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['captain'])
+        self.assertIsNone(self.team.captain)
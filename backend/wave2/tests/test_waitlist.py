@@ -0,0 +1,68 @@
+from django.utils import timezone
+from rest_framework import status, test
+
+from wave2 import waitlist
+from wave2.models import SmallInteger, Team
+
+
+class TestWaitlist(test.APITestCase):
+    def setUp(self):
+        self.max_teams = SmallInteger.objects.create(name='max_teams',
+                                                     value=2)
+        self.confirmed = [
+            Team.objects.create(name=f'confirmed{i}', confirmed=True)
+            for i in range(2)
+        ]
+        now = timezone.now()
+        self.waiting = [
+            Team.objects.create(name=f'waiting{i}',
+                                ready=now - timezone.timedelta(minutes=i))
+            for i in range(3)
+        ]  # waiting2 has waited longest
+
+    def test_admit_queues_team_when_full(self):
+        team = Team.objects.create(name='new')
+
+        waitlist.admit(team)
+        team.refresh_from_db()
+
+        self.assertFalse(team.confirmed, 'team should wait')
+        self.assertIsNotNone(team.ready)
+
+    def test_admit_confirms_team_when_place_is_free(self):
+        Team.objects.update(ready=None)
+        self.confirmed[0].delete()
+        team = Team.objects.create(name='new')
+
+        waitlist.admit(team)
+        team.refresh_from_db()
+
+        self.assertTrue(team.confirmed, 'team should be confirmed')
+        self.assertIsNone(team.ready)
+
+    def test_drop_promotes_longest_waiting_team(self):
+        waitlist.drop(self.confirmed[0])
+
+        self.assertEqual(
+            set(Team.objects.filter(confirmed=True)),
+            {self.confirmed[1], self.waiting[2]}
+        )
+
+    def test_promote_fills_all_free_places_in_order(self):
+        self.max_teams.value = 4
+        self.max_teams.save()
+
+        promoted = waitlist.promote()
+
+        self.assertEqual(promoted, [self.waiting[2].id, self.waiting[1].id])
+        self.assertEqual(list(waitlist.queue()), [self.waiting[0]])
+
+    def test_get_waitlist_returns_positions_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/teams/waitlist/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(team['name'], team['position']) for team in response.data],
+            [('waiting2', 1), ('waiting1', 2), ('waiting0', 3)]
+        )
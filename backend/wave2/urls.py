@@ -2,15 +2,19 @@ from django.urls import include, path
 
 from rest_framework import routers
 
-from . import views
+from . import async_views, views
 
 
 router = routers.SimpleRouter()
 router.register('users', views.UserViewSet)
 router.register('technologies', views.TechnologyViewSet)
 router.register('teams', views.TeamViewSet)
+router.register('logs', views.LogViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('async/teams/', async_views.team_list),
+    path('async/teams/<uuid:pk>/', async_views.team_detail),
+    path('async/users/<int:pk>/', async_views.user_detail),
 ]
 
@@ -0,0 +1,142 @@
+"""
+Per-table version stamps for conditional GETs and cached responses.
+
+Every table that a cached response depends on has a stamp in the shared
+cache, the time of its last change. Signals bump it when a row is saved
+or deleted (see signals.py); code that changes rows with bulk queries
+bumps it itself. A view with ConditionalMixin derives its ETag and
+Last-Modified from the stamps, so a request with a matching
+If-None-Match is answered with 304 without querying the table, and
+keeps its json responses under the ETag in CACHE_MIDDLEWARE_ALIAS.
+A change of the tables changes the ETag, so no stale response is served.
+
+During a request the stamps of all the tracked tables are read together
+once, so the authentication (see authentication.py) and the ETag of the
+view share one query.
+"""
+import hashlib
+import time
+
+from asgiref.local import Local
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+
+# the tables whose stamps a request may need
+tracked = set()
+# the stamps read in the current request, None outside of one
+_request = Local()
+
+
+def key(model):
+    return f'wave2:version:{model._meta.label_lower}'
+
+
+def track(*models):
+    tracked.update(models)
+
+
+def start_request():
+    _request.stamps = {}
+
+
+def end_request():
+    _request.stamps = None
+
+
+def bump(*models):
+    """
+    Marks the tables as changed once the change is committed. Writing
+    the stamps inside the transaction would lock their cache rows until
+    the commit and make every writer of the tables wait for the others.
+    """
+    def set_stamps():
+        now = time.time()
+        cache.set_many({key(model): now for model in models}, None)
+        if getattr(_request, 'stamps', None):
+            _request.stamps = {}
+
+    transaction.on_commit(set_stamps)  # runs now outside of a transaction
+
+
+def stamps(*models):
+    """
+    Returns the stamps of the tables, starting the missing ones now.
+    """
+    keys = [key(model) for model in models]
+    found = getattr(_request, 'stamps', None)
+    in_request = found is not None
+    if not in_request:
+        found = {}
+    if unread := {k for k in keys if k not in found}:
+        if in_request and not found:
+            unread.update(key(model) for model in tracked)
+        found.update(cache.get_many(unread))
+        if missing := {k: time.time() for k in keys if k not in found}:
+            cache.set_many(missing, None)
+            found.update(missing)
+    return [found[k] for k in keys]
+
+
+class ConditionalMixin:
+    """
+    Adds ETag and Last-Modified to the list and retrieve responses
+    and caches them. `versioned` lists the models whose rows the
+    responses show.
+    """
+    versioned = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        track(*cls.versioned)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+    def conditional(self, view, request, *args, **kwargs):
+        versions = stamps(*self.versioned)
+        digest = hashlib.md5(repr((
+            versions, request.get_full_path(),
+            request.accepted_renderer.format,
+            request.user.is_authenticated,
+        )).encode()).hexdigest()
+        etag = f'"{digest}"'
+        last_modified = int(max(versions))
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self.cached(request, view, digest, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    @staticmethod
+    def cached(request, view, digest, *args, **kwargs):
+        # the browsable api pages hold a csrf token, only json is shared
+        if request.accepted_renderer.format != 'json':
+            return view(request, *args, **kwargs)
+
+        responses = caches[settings.CACHE_MIDDLEWARE_ALIAS]
+        key = f'wave2:response:{digest}'
+        if hit := responses.get(key):
+            content, content_type = hit
+            return HttpResponse(content, content_type=content_type)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(lambda response: responses.set(
+                key, (response.content, response['Content-Type']),
+                settings.CACHE_MIDDLEWARE_SECONDS,
+            ))
+        return response
@@ -1,75 +1,170 @@
 # coding=windows-1251
+from operator import attrgetter
+
 from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
+from django.db import transaction
 from django.template.loader import render_to_string
-from django.utils import timezone
 from rest_framework.decorators import action
-from rest_framework.permissions import (AllowAny, IsAuthenticated,
+from rest_framework.permissions import (AllowAny, IsAdminUser,
+                                        IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
+from . import audit, bulk, waitlist
+from .export import ExportMixin, names
+from .filters import LookupFilter
 from .models import Log, Team, Technology, User
 from .permissions import UserPermissions, TeamPermissions
-from .serializers import TeamSerializer, TechnologySerializer, UserSerializer
+from .serializers import (BulkTeamSerializer, LogSerializer, TeamSerializer,
+                          TechnologySerializer, UserSerializer)
+from .sparse import SparseFieldsViewMixin
+from .versions import ConditionalMixin
 
 
 def create_log(serializer):
-    Log.objects.create(user=serializer._kwargs['context']['request'].user,
-                       action=serializer._kwargs['data'])
+    audit.record(serializer._kwargs['context']['request'].user,
+                 serializer._kwargs['data'])
 
 
-class TeamViewSet(ModelViewSet):
+class TeamViewSet(SparseFieldsViewMixin, ExportMixin, ConditionalMixin,
+                  ModelViewSet):
     queryset = Team.objects.all()
     serializer_class = TeamSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, TeamPermissions]
-
+    ordering = ('date_joined', 'id')
+    prefetch = {'users': 'users', 'technologies': 'technologies'}
+    versioned = (Team, User, Technology)
+    filter_backends = [LookupFilter]
+    filter_fields = {'discord_id': 'users__discord_id'}
+    search_fields = ('name', 'project_name')
+
+    export_queryset = Team.objects.select_related('captain').prefetch_related(
+        'users', 'technologies'
+    )
+    export_columns = {
+        'name': attrgetter('name'),
+        'confirmed': attrgetter('confirmed'),
+        'ready': attrgetter('ready'),
+        'member_count': attrgetter('member_count'),
+        'captain': lambda team: team.captain and str(team.captain),
+        'users': names('users'),
+        'project_name': attrgetter('project_name'),
+        'github_link': attrgetter('github_link'),
+        'technologies': names('technologies'),
+    }
+
+    @transaction.atomic
     def perform_create(self, serializer):
         user = serializer._kwargs['context']['request'].user
-        user.is_captain = True
-        user.save()
 
         create_log(serializer)
 
-        return super().perform_create(serializer)
+        # the captain is always a member
+        users = serializer.validated_data['users']
+        if user not in users:
+            users.append(user)
+        serializer.save(captain=user)
+        user.is_captain = True
+        user.save(update_fields=['is_captain'])
 
+    @transaction.atomic
     def perform_update(self, serializer):
         create_log(serializer)
         return super().perform_update(serializer)
         
     def perform_destroy(self, instance):
-        for user in instance.users.all():
-            if user.is_captain:
-                user.is_captain = False
-                user.save()
-                break
-        return super().perform_destroy(instance)
+        if instance.captain:
+            instance.captain.is_captain = False
+            instance.captain.save()
+        super().perform_destroy(instance)
+        if instance.confirmed:
+            waitlist.promote()
 
     @action(detail=True, methods=['post', 'get'])
     def change_captain(self, request, pk=None):
-        self.check_object_permissions(request, Team.objects.get(id=pk))
+        team = Team.objects.get(id=pk)
+        self.check_object_permissions(request, team)
         if request.method == 'POST':
-            new_captain = User.objects.get(id=int(request.data.get('users')))
+            try:
+                new_captain = team.users.get(id=int(request.data.get('users')))
+            except (TypeError, ValueError, User.DoesNotExist):
+                raise ValidationError({'users': 'pick a member of the team'})
             request.user.is_captain = False
             new_captain.is_captain = True
-            request.user.save()
-            new_captain.save()
+            request.user.save(update_fields=['is_captain'])
+            new_captain.save(update_fields=['is_captain'])
+            team.captain = new_captain
+            team.save(update_fields=['captain'])
             return Response({'status': 'done', 'details': 'captain changed'})
         else:
             return Response({'status': 'ready', 'details': 'pick a user'},
                             status=405)
 
-
-class TechnologyViewSet(ReadOnlyModelViewSet):
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser],
+            serializer_class=BulkTeamSerializer)
+    def bulk(self, request):
+        serializer = BulkTeamSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        count = bulk.apply(serializer.validated_data['operation'],
+                           serializer.validated_data['teams'], request.user)
+        return Response({'status': 'done',
+                         'details': f'{count} teams updated'})
+
+    @action(detail=False)
+    def waitlist(self, request):
+        return Response([
+            {'id': team['id'], 'name': team['name'], 'position': position}
+            for position, team in enumerate(
+                waitlist.queue().values('id', 'name'), start=1
+            )
+        ])
+
+
+class TechnologyViewSet(ConditionalMixin, ReadOnlyModelViewSet):
     queryset = Technology.objects.all()
     serializer_class = TechnologySerializer
+    pagination_class = None
+    versioned = (Technology,)
+
+
+class LogViewSet(ReadOnlyModelViewSet):
+    """
+    The log for the organizers, newest first. ?since= and ?until= limit
+    the dates, which the (date, user) index answers.
+    """
+    queryset = Log.objects.all()
+    serializer_class = LogSerializer
+    permission_classes = [IsAdminUser]
+    ordering = ('-date', '-id')
+    filter_backends = [LookupFilter]
+    filter_fields = {'user': 'user', 'since': 'date__gte',
+                     'until': 'date__lt'}
 
 
-class UserViewSet(ModelViewSet):
+class UserViewSet(SparseFieldsViewMixin, ExportMixin, ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [UserPermissions, AllowAny]
+    ordering = 'id'
+    prefetch = {'technologies': 'technologies', 'team_set': 'team_set'}
+    filter_backends = [LookupFilter]
+    filter_fields = {'discord_id': 'discord_id', 'form': 'form'}
+    search_fields = ('first_name', 'last_name', 'email')
+
+    export_queryset = User.objects.select_related('current_team')
+    export_columns = {
+        field: attrgetter(field) for field in (
+            'id', 'first_name', 'last_name', 'email', 'phone', 'form',
+            'tshirt_size', 'food_preferences', 'alergies', 'is_active',
+            'is_captain',
+        )
+    }
+    export_columns['team'] = (
+        lambda user: user.current_team and user.current_team.name
+    )
 
     @action(detail=False, methods=['post', 'get'])
     def forgotten_password(self, request):
@@ -112,18 +207,28 @@ class UserViewSet(ModelViewSet):
         user = User.objects.get(id=pk)
         self.check_object_permissions(request, user)
         if request.method == 'POST':
-            team = user.team_set.first()
-            was_confirmed = team.confirmed
-            user.team_set.clear()
-            if team.confirmed and not team.is_confirmed:
-                team.is_full = False
-                team.confirmed = False
-                team.save()
-                ready_team = Team.objects.filter(ready__lte=timezone.now()).first()
-                if ready_team:
-                    ready_team.ready = None
-                    ready_team.confirmed = True
-                    ready_team.save()
+            with transaction.atomic():
+                # team before user, as in team updates
+                team = Team.objects.select_for_update().filter(
+                    users=user
+                ).first()
+                if team is None:
+                    return Response({'status': 'error',
+                                     'details': 'user has no team'},
+                                    status=400)
+                user = User.objects.select_for_update().get(id=user.id)
+                user.team_set.clear()
+                team.refresh_from_db(fields=['member_count'])
+                if user.is_captain:
+                    user.is_captain = False
+                    user.save(update_fields=['is_captain'])
+                if (team.captain_id in (None, user.id) and
+                        not team.hand_over_captaincy()):
+                    team.delete()  # the last member left
+                    if team.confirmed:
+                        waitlist.promote()
+                elif not team.is_confirmed:
+                    waitlist.drop(team)
 
             return Response({'status': 'done', 'details': 'team leaved'})
         else:
@@ -0,0 +1,84 @@
+"""
+Waitlist for the max_teams limit.
+
+A team with enough members waits in the queue (Team.ready is the time
+it joined) until there is a free place among the confirmed teams.
+Everything that changes the confirmed teams locks the max_teams row
+first, so concurrent requests promote teams one after another.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import versions
+from .models import SmallInteger, Team
+from .signals import teams_bulk_changed
+
+
+def queue():
+    return Team.objects.filter(
+        confirmed=False, ready__isnull=False
+    ).order_by('ready', 'date_joined')
+
+
+def lock():
+    """
+    Locks the max_teams row until the end of the transaction,
+    returns its current value.
+    """
+    return SmallInteger.objects.select_for_update().get(
+        name='max_teams'
+    ).value
+
+
+@transaction.atomic
+def promote(team_ids=None):
+    """
+    Confirms the longest waiting teams, only those of team_ids if given,
+    while there are free places, returns their ids.
+    """
+    max_teams = lock()
+    free = max_teams - Team.objects.filter(confirmed=True).count()
+    if free <= 0:
+        return []
+
+    waiting = queue()
+    if team_ids is not None:
+        waiting = waiting.filter(id__in=team_ids)
+    ids = list(
+        waiting.select_for_update().values_list('id', flat=True)[:free]
+    )
+    Team.objects.filter(id__in=ids).update(confirmed=True, ready=None)
+    versions.bump(Team)
+    teams_bulk_changed.send(sender=Team)
+    return ids
+
+
+@transaction.atomic
+def admit(team):
+    """
+    Puts a team with enough members in the queue and
+    confirms it if there is a free place.
+    """
+    if team.confirmed or team.ready:
+        return
+    lock()
+    team.ready = timezone.now()
+    team.save(update_fields=['ready'])
+    if team.id in promote():
+        team.confirmed = True
+        team.ready = None
+
+
+@transaction.atomic
+def drop(team):
+    """
+    Takes a team out of the confirmed teams and the queue and
+    gives its place to the next waiting team.
+    """
+    was_confirmed = team.confirmed
+    team.is_full = False
+    team.confirmed = False
+    team.ready = None
+    team.save(update_fields=['is_full', 'confirmed', 'ready'])
+    if was_confirmed:
+        promote()
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class Wave3Config(AppConfig):
     name = 'wave3'
+
+    def ready(self):
+        from . import signals  # noqa: F401
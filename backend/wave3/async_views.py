@@ -0,0 +1,8 @@
+from wave2.async_views import list_data, read_only, respond
+
+from .views import MentorViewSet
+
+
+@read_only
+async def mentor_list(request):
+    return await respond(MentorViewSet, request, list_data)
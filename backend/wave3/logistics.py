@@ -0,0 +1,66 @@
+"""
+T-shirt, food and allergy counts for the participants and mentors.
+
+The report is computed with a few grouped queries and kept in the shared
+cache. Saving or deleting a user, team or mentor, changing a team's
+members and the bulk changes of the teams, which send
+teams_bulk_changed instead, drop it (see signals.py); import_mentors
+drops it itself. TIMEOUT only bounds what a missed change costs.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, CharField, Count, Q, Value, When
+
+from wave2.models import User
+
+from .models import Mentor
+
+CACHE_KEY = 'wave3:logistics'
+TIMEOUT = 300
+FIELDS = 'tshirt_size', 'food_preferences', 'alergies'
+
+
+def participants():
+    """
+    Members of the confirmed and waitlisted teams with their team status.
+    """
+    return User.objects.filter(
+        Q(current_team__confirmed=True) |
+        Q(current_team__ready__isnull=False)
+    ).annotate(status=Case(
+        When(current_team__confirmed=True, then=Value('confirmed')),
+        default=Value('waitlisted'),
+        output_field=CharField(),
+    ))
+
+
+def compute():
+    report = {status: {field: {} for field in FIELDS}
+              for status in ('confirmed', 'waitlisted')}
+    for field in FIELDS:
+        rows = participants().exclude(**{field: ''}).exclude(
+            **{f'{field}__isnull': True}
+        )
+        for row in rows.values('status', field).annotate(count=Count('id')):
+            report[row['status']][field][row[field]] = row['count']
+    for status, count in participants().values_list('status').annotate(
+            count=Count('id')):
+        report[status]['count'] = count
+    for status in report.values():
+        status.setdefault('count', 0)
+
+    report['mentors'] = {
+        'tshirt_size': dict(
+            Mentor.objects.values_list('tshirt_size').annotate(Count('id'))
+        ),
+        'count': Mentor.objects.count(),
+    }
+    return report
+
+
+def report():
+    return cache.get_or_set(CACHE_KEY, compute, TIMEOUT)
+
+
+def invalidate():
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
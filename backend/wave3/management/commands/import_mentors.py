@@ -0,0 +1,109 @@
+import csv
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from django.core.validators import validate_email
+from django.db import transaction
+
+from wave2 import versions
+from wave2.models import Technology
+from wave3 import logistics
+from wave3.models import Mentor
+
+# columns of the form export, in order
+COLUMNS = ('technologies', 'profile_picture', 'full_name', 'email', 'phone',
+           'was_mentor', 'elsys', 'organization', 'position', 'free',
+           'tshirt_size', 'agreed', 'xp')
+UPDATED_FIELDS = [column for column in COLUMNS if column != 'technologies']
+YES = '\u0414\u0430'  # was_mentor is answered in Bulgarian
+
+
+class Command(BaseCommand):
+    help = ('Creates or updates (by email) the mentors from the '
+            'tab separated form export.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='mentors.tsv')
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        technology_ids = dict(Technology.objects.values_list('name', 'id'))
+        existing = {mentor.email: mentor for mentor in Mentor.objects.all()}
+
+        mentors, tags, rejected = {}, {}, []
+        with open(options['path'], encoding='utf-8', newline='') as f:
+            for line, row in enumerate(csv.reader(f, delimiter='\t'), 1):
+                try:
+                    mentor, names = self.parse(row, existing)
+                except ValidationError as e:
+                    rejected.append((line, '; '.join(e.messages)))
+                    continue
+                if mentor.email in mentors:
+                    self.stderr.write(f'line {line}: replaces the earlier '
+                                      f'row of {mentor.email}')
+                unknown = names - technology_ids.keys()
+                if unknown:
+                    self.stderr.write(f'line {line}: unknown technologies '
+                                      f'{", ".join(sorted(unknown))}')
+                mentors[mentor.email] = mentor
+                tags[mentor.email] = names & technology_ids.keys()
+
+        new = [mentor for mentor in mentors.values() if mentor.pk is None]
+        old = [mentor for mentor in mentors.values() if mentor.pk]
+        Mentor.objects.bulk_create(new, batch_size=500)
+        Mentor.objects.bulk_update(old, UPDATED_FIELDS, batch_size=500)
+
+        # bulk_create does not return ids on MySQL
+        mentor_ids = dict(
+            Mentor.objects.filter(email__in=mentors)
+            .values_list('email', 'id')
+        )
+        Through = Mentor.technologies.through
+        Through.objects.filter(mentor_id__in=mentor_ids.values()).delete()
+        Through.objects.bulk_create([
+            Through(mentor_id=mentor_ids[email],
+                    technology_id=technology_ids[name])
+            for email, names in tags.items() for name in names
+        ], batch_size=1000)
+        # the bulk queries send no signals
+        versions.bump(Mentor)
+        logistics.invalidate()
+
+        for line, reason in rejected:
+            self.stderr.write(f'line {line} rejected: {reason}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(new)} mentors created, {len(old)} updated, '
+            f'{len(rejected)} rows rejected'
+        ))
+
+    @staticmethod
+    def parse(row, existing):
+        """
+        Returns the unsaved mentor and the names of its technologies.
+        """
+        if len(row) != len(COLUMNS):
+            raise ValidationError(
+                f'expected {len(COLUMNS)} columns, got {len(row)}'
+            )
+        data = dict(zip(COLUMNS, (value.strip() for value in row)))
+        validate_email(data['email'])
+
+        names = {name.strip() for name in data.pop('technologies').split(',')}
+        data['phone'] = data['phone'].replace(' ', '')
+        data['was_mentor'] = data['was_mentor'] == YES
+        try:
+            data['elsys'] = int(data['elsys']) if data['elsys'] else None
+        except ValueError:
+            raise ValidationError(f'invalid elsys year {data["elsys"]}')
+
+        mentor = existing.get(data['email']) or Mentor()
+        for field, value in data.items():
+            setattr(mentor, field, value)
+        try:
+            mentor.full_clean(exclude=['technologies'])
+        except ValidationError as e:
+            raise ValidationError([
+                f'{field}: {" ".join(messages)}'
+                for field, messages in e.message_dict.items()
+            ])
+        return mentor, names - {''}
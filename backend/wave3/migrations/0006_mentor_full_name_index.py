@@ -0,0 +1,17 @@
+# Generated by Django 3.1 on 2026-10-17 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wave3', '0005_auto_20210303_1033'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mentor',
+            index=models.Index(fields=['full_name', 'id'], name='wave3_mento_full_na_8d0267_idx'),
+        ),
+    ]
@@ -17,3 +17,6 @@ class Mentor(models.Model):
     agreed = models.TextField()
     xp = models.TextField()
     displayed = models.BooleanField(default=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['full_name', 'id'])]
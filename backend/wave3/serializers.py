@@ -1,9 +1,11 @@
 from rest_framework import serializers
 
 from wave2.serializers import TechnologyField
+from wave2.sparse import SparseFieldsSerializerMixin
 from .models import Mentor
 
-class MentorSerializer(serializers.ModelSerializer):
+class MentorSerializer(SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
     technologies = TechnologyField(many=True)
 
     class Meta:
@@ -0,0 +1,38 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from wave2 import versions
+from wave2.models import Team, User
+from wave2.signals import teams_bulk_changed
+
+from . import logistics
+from .models import Mentor
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=Mentor)
+@receiver(post_delete, sender=Mentor)
+@receiver(teams_bulk_changed)
+def invalidate_logistics(**kwargs):
+    logistics.invalidate()
+
+
+@receiver(m2m_changed, sender=Team.users.through)
+def invalidate_logistics_on_members(action, **kwargs):
+    if action.startswith('post_'):
+        logistics.invalidate()
+
+
+@receiver(post_save, sender=Mentor)
+@receiver(post_delete, sender=Mentor)
+def bump_mentor_version(**kwargs):
+    versions.bump(Mentor)
+
+
+@receiver(m2m_changed, sender=Mentor.technologies.through)
+def bump_mentor_version_on_technologies(action, **kwargs):
+    if action.startswith('post_'):
+        versions.bump(Mentor)
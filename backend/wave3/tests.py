@@ -1,3 +1,218 @@
-from django.test import TestCase
+import tempfile
+from io import StringIO
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import AsyncClient, TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework import test
+
+from wave2 import bulk, waitlist
+from wave2.models import SmallInteger, Team, Technology, User
+from wave3.models import Mentor
+
+
+def row(email, technologies='Python, C', phone='0888123456', elsys='2016'):
+    return '\t'.join([
+        technologies, 'https://drive.google.com/open?id=1', 'Full Name',
+        email, phone, 'Да', elsys, 'Company', 'Developer',
+        '12.03', 'M', 'agreed', '5 years',
+    ])
+
+
+class TestImportMentors(TestCase):
+    def setUp(self):
+        self.python = Technology.objects.create(name='Python')
+        self.c = Technology.objects.create(name='C')
+
+    def call(self, *rows):
+        with tempfile.NamedTemporaryFile('w', suffix='.tsv') as f:
+            f.write('\n'.join(rows))
+            f.flush()
+            err = StringIO()
+            call_command('import_mentors', f.name,
+                         stdout=StringIO(), stderr=err)
+        return err.getvalue()
+
+    def test_creates_mentors_with_technologies(self):
+        self.call(row('a@abv.bg'), row('b@abv.bg', technologies='C'))
+
+        mentor = Mentor.objects.get(email='a@abv.bg')
+        self.assertTrue(mentor.was_mentor)
+        self.assertEqual(mentor.elsys, 2016)
+        self.assertEqual(set(mentor.technologies.all()), {self.python, self.c})
+        self.assertEqual(
+            list(Mentor.objects.get(email='b@abv.bg').technologies.all()),
+            [self.c]
+        )
+
+    def test_reimport_updates_by_email(self):
+        self.call(row('a@abv.bg'))
+        mentor = Mentor.objects.get()
+
+        self.call(row('a@abv.bg', technologies='C', elsys=''))
+        mentor.refresh_from_db()
+
+        self.assertEqual(Mentor.objects.count(), 1)
+        self.assertIsNone(mentor.elsys)
+        self.assertEqual(list(mentor.technologies.all()), [self.c])
+
+    def test_reimport_query_count_does_not_depend_on_rows(self):
+        rows = [row(f'{i}@abv.bg') for i in range(20)]
+        self.call(*rows)
+
+        # technologies, mentors, update, ids, delete and insert tags,
+        # savepoint and release; the version stamp follows the commit
+        with self.assertNumQueries(6 + 2):
+            self.call(*rows)
+
+    def test_invalid_rows_are_rejected_and_reported(self):
+        err = self.call(row('a@abv.bg'), row('not an email'),
+                        row('b@abv.bg', elsys='twenty'), 'short\trow')
+
+        self.assertEqual(list(Mentor.objects.values_list('email', flat=True)),
+                         ['a@abv.bg'])
+        self.assertIn('line 2 rejected', err)
+        self.assertIn('line 3 rejected', err)
+        self.assertIn('line 4 rejected', err)
+
+    def test_unknown_technologies_are_reported(self):
+        err = self.call(row('a@abv.bg', technologies='Python, Cobol'))
+
+        self.assertIn('Cobol', err)
+        self.assertEqual(list(Mentor.objects.get().technologies.all()),
+                         [self.python])
+
+
+class TestMentorExport(test.APITestCase):
+    def test_exports_hidden_mentors_too(self):
+        for email, displayed in ('a@abv.bg', True), ('b@abv.bg', False):
+            Mentor.objects.create(full_name='Mentor', email=email, phone='0',
+                                  was_mentor=False, organization='', free='',
+                                  position='', tshirt_size='l', agreed='',
+                                  xp='', displayed=displayed)
+        client = test.APIClient()
+        client.force_authenticate(User.objects.create(
+            username='staff', email='staff@abv.bg', is_staff=True
+        ))
+
+        response = client.get('/mentors/export/?output=ndjson')
+        lines = b''.join(response.streaming_content).splitlines()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(lines), 2)
+
+
+class TestLogistics(test.APITransactionTestCase):
+    # on_commit callbacks only run outside of TestCase
+    def setUp(self):
+        cache.clear()
+        self.client = test.APIClient()
+        self.client.force_authenticate(User.objects.create(
+            username='staff', email='staff@abv.bg', is_staff=True
+        ))
+
+    def create_team(self, name, sizes, **kwargs):
+        team = Team.objects.create(name=name, **kwargs)
+        team.users.set([
+            User.objects.create(username=f'{name}{i}',
+                                email=f'{name}{i}@abv.bg', tshirt_size=size,
+                                alergies='nuts' if i == 0 else '')
+            for i, size in enumerate(sizes)
+        ])
+        return team
+
+    def get(self):
+        response = self.client.get('/logistics/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_counts_are_split_by_team_status(self):
+        self.create_team('confirmed', ['m', 'm', 'l'], confirmed=True)
+        self.create_team('waiting', ['s'], ready=timezone.now())
+        self.create_team('forming', ['xl'])
+        Mentor.objects.create(full_name='Mentor', email='m@abv.bg', phone='0',
+                              was_mentor=False, organization='', free='',
+                              position='', tshirt_size='xl', agreed='', xp='')
+
+        report = self.get()
+
+        self.assertEqual(report['confirmed']['count'], 3)
+        self.assertEqual(report['confirmed']['tshirt_size'],
+                         {'m': 2, 'l': 1})
+        self.assertEqual(report['confirmed']['food_preferences'], {'0': 3})
+        self.assertEqual(report['confirmed']['alergies'], {'nuts': 1})
+        self.assertEqual(report['waitlisted']['tshirt_size'], {'s': 1})
+        self.assertEqual(report['mentors'], {'tshirt_size': {'xl': 1},
+                                             'count': 1})
+
+    def test_report_is_cached_until_teams_change(self):
+        team = self.create_team('team', ['m'])
+        self.assertEqual(self.get()['confirmed']['count'], 0)
+
+        with self.assertNumQueries(1):
+            self.get()
+
+        team.confirmed = True
+        team.save()
+
+        self.assertEqual(self.get()['confirmed']['count'], 1)
+
+    def test_promotions_and_bulk_operations_drop_the_report(self):
+        SmallInteger.objects.create(name='max_teams', value=1)
+        team = self.create_team('team', ['m'], ready=timezone.now())
+        self.assertEqual(self.get()['waitlisted']['count'], 1)
+
+        waitlist.promote()
+        self.assertEqual(self.get()['confirmed']['count'], 1)
+
+        bulk.apply('unconfirm', [team.id])
+        self.assertEqual(self.get()['confirmed']['count'], 0)
+
+    def test_mentor_import_drops_the_report(self):
+        self.assertEqual(self.get()['mentors']['count'], 0)
+
+        with tempfile.NamedTemporaryFile('w', suffix='.tsv') as f:
+            f.write(row('a@abv.bg'))
+            f.flush()
+            call_command('import_mentors', f.name,
+                         stdout=StringIO(), stderr=StringIO())
+
+        self.assertEqual(self.get()['mentors']['count'], 1)
+
+
+class TestMentorList(test.APITestCase):
+    def test_pages_are_ordered_by_name(self):
+        for name in 'Cvetan', 'Asen', 'Boris':
+            Mentor.objects.create(full_name=name, email='m@abv.bg', phone='0',
+                                  was_mentor=False, organization='', free='',
+                                  position='', tshirt_size='l', agreed='',
+                                  xp='')
+
+        first = self.client.get('/mentors/?page_size=2').data
+        second = self.client.get(first['next']).data
+
+        self.assertEqual(
+            [mentor['full_name'] for mentor in first['results']] +
+            [mentor['full_name'] for mentor in second['results']],
+            ['Asen', 'Boris', 'Cvetan'],
+        )
+        self.assertIsNone(second['next'])
+
+
+class TestAsyncMentorList(TransactionTestCase):
+    async def test_lists_displayed_mentors(self):
+        for name, displayed in ('Asen', True), ('Boris', False):
+            await sync_to_async(Mentor.objects.create)(
+                full_name=name, email='m@abv.bg', phone='0', was_mentor=False,
+                organization='', free='', position='', tshirt_size='l',
+                agreed='', xp='', displayed=displayed,
+            )
+
+        response = await AsyncClient().get('/async/mentors/')
+
+        self.assertEqual(
+            [mentor['full_name'] for mentor in response.json()['results']],
+            ['Asen'],
+        )
@@ -2,7 +2,7 @@ from django.urls import include, path
 
 from rest_framework import routers
 
-from . import views
+from . import async_views, views
 
 
 router = routers.SimpleRouter()
@@ -10,4 +10,6 @@ router.register('mentors', views.MentorViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('logistics/', views.LogisticsView.as_view()),
+    path('async/mentors/', async_views.mentor_list),
 ]
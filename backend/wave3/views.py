@@ -1,10 +1,44 @@
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from operator import attrgetter
+
+from rest_framework.permissions import IsAdminUser, IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
+from wave2.export import ExportMixin, names
+from wave2.models import Technology
+from wave2.sparse import SparseFieldsViewMixin
+from wave2.versions import ConditionalMixin
+
+from . import logistics
 from .models import Mentor
 from .serializers import MentorSerializer
 
-class MentorViewSet(ReadOnlyModelViewSet):
-    queryset = Mentor.objects.filter(displayed=True).order_by('full_name')
+class MentorViewSet(SparseFieldsViewMixin, ExportMixin, ConditionalMixin,
+                    ReadOnlyModelViewSet):
+    queryset = Mentor.objects.filter(displayed=True)
     serializer_class = MentorSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    ordering = ('full_name', 'id')
+    prefetch = {'technologies': 'technologies'}
+    versioned = (Mentor, Technology)
+
+    export_queryset = Mentor.objects.prefetch_related('technologies')
+    export_columns = {
+        field: attrgetter(field) for field in (
+            'id', 'full_name', 'email', 'phone', 'tshirt_size',
+            'organization', 'position', 'free', 'displayed',
+        )
+    }
+    export_columns['technologies'] = names('technologies')
+
+
+class LogisticsView(APIView):
+    """
+    T-shirt, food and allergy counts of the confirmed and waitlisted
+    teams' members and of the mentors.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(logistics.report())